@@ -1,11 +1,28 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
+import numpy as np
 import io
+import json
+
+from cache_projecao import estatisticas, projecao_cacheada, tabela_cacheada
+from cenarios import Diferenca, Repositorio, comparar, lado_a_lado
+from coortes import Curvas, projetar_curvas, receita_por_idade
+from modelo import ORDEM, PERIODOS, Parametros, defaults, key_map
+from metas import Meta, resolver
+from instrumentacao import Perfil, ativo_por_ambiente, novo_historico
+from monte_carlo import VARIAVEIS, distribuicao_relativa, simular
+from portfolio import consolidar, ler_arquivo, projetar_portfolio, ranking, validar
+from realizado import DESTINOS, DIRETORIO_ENV, Formato, Realizado, caminho_no_diretorio, diretorio_razoes, ler_mapa, variancia
+from relatorio import formatar_dre, tabela_dre, template_parametros, valores_do_template
+from sensibilidade import KPIS, mapa_calor, ordenar_por_impacto, tornado
 
 # --- 1. CONFIGURAÇÃO ---
 st.set_page_config(page_title="Vaiontec | Growth Intelligence", layout="wide", page_icon="🚀", initial_sidebar_state="collapsed")
 
+# Perfil de execução (debug): VAIONTEC_PERFIL=1 ou ?perfil=1 na URL; desligado, `etapa` é um no-op.
+# Memória (tracemalloc, global ao processo) só com a variável de ambiente: pela URL, só tempos.
+perfil = Perfil(ativo_por_ambiente() or st.query_params.get('perfil') == '1', memoria=ativo_por_ambiente())
+
 # --- 2. CSS (CORPORATE BLUE + INPUTS PRO) ---
 st.markdown("""
     <style>
@@ -111,299 +128,521 @@ GLOSSARIO_DB = [
 ]
 
 # --- 4. INICIALIZAÇÃO DE ESTADO ---
-defaults = {
-    # 1. Receita Drivers
-    'cli_ini': 50, 'cresc': 0.10, 'churn': 0.03, 'ticket': 500.0, 'upsell': 0.05,
-    # 2. Variáveis
-    'cogs': 30.0, 'comissao': 0.05, 'imposto': 0.06, 'taxa': 0.02,
-    # 3. Fixos
-    'mkt': 5000.0, 'outros': 3000.0, 
-    # 4. Folha
-    's_socio': 8000.0, 'q_socio': 2, 
-    's_dev': 5000.0, 'q_dev': 2,
-    's_cs': 2500.0, 'q_cs': 1,
-    's_venda': 3000.0, 'q_venda': 1,
-    'encargos': 0.35,
-    # 5. Contábil
-    'deprec': 400.0, 'amort': 600.0, 'fin': 0.0, 'irpj': 0.0
+FORMATOS_RAZAO = {
+    "Padrão (, AAAA-MM-DD e 1234.56)": Formato(),
+    "Brasil (; DD/MM/AAAA e 1.234,56)": Formato(sep=';', decimal=',', milhar='.', encoding='latin-1', formato_data='%d/%m/%Y'),
 }
-
-key_map = {
-    'cli_ini': 'Clientes Iniciais', 'cresc': 'Tx Crescimento Mensal', 'churn': 'Tx Churn Mensal',
-    'ticket': 'Ticket Médio (R$)', 'upsell': 'Tx Upsell (% Rec)',
-    'cogs': 'COGS Unitário (R$)', 'comissao': 'Tx Comissão (%)', 'imposto': 'Tx Imposto Simples (%)', 'taxa': 'Tx Meios Pagto (%)',
-    'mkt': 'Budget Marketing (R$)', 'outros': 'Outras Desp. Fixas (R$)',
-    's_socio': 'Salário Sócio', 'q_socio': 'Qtd Sócio',
-    's_dev': 'Salário Dev', 'q_dev': 'Qtd Dev',
-    's_cs': 'Salário Suporte', 'q_cs': 'Qtd Suporte',
-    's_venda': 'Salário Vendas', 'q_venda': 'Qtd Vendas',
-    'encargos': 'Tx Encargos Folha (%)',
-    'deprec': 'Depreciação (R$)', 'amort': 'Amortização (R$)', 'fin': 'Resultado Fin. (R$)', 'irpj': 'Tx IRPJ Extra (%)'
+# Widgets de configuração (fora dos inputs do modelo) e seus valores iniciais
+CHAVES_COORTE = dict(zip(Curvas._fields, ['coorte_churn_ini', 'coorte_churn_fim', 'coorte_mv_churn', 'coorte_exp_ini',
+                                          'coorte_exp_fim', 'coorte_mv_exp', 'coorte_idade_base']))
+ESTADO_UI = {
+    'coorte_on': False, **{CHAVES_COORTE[k]: v for k, v in Curvas()._asdict().items()}, 'coorte_visao': "Retenção de receita (%)",
+    'mc_on': False, 'mc_tipo': 'normal', 'mc_n': 50_000, 'mc_seed': 42, 'mc_por_mes': False, 'mc_mes': None,  # None: último mês
+    **{f'mc_d_{k}': 20 for k in VARIAVEIS},
+    'visao_dre': 'Mensal', 'sens_delta': 10, 'sens_kpi': KPIS[0], 'sens_x': 'ticket', 'sens_y': 'churn',
+    'sens_amp': 50, 'sens_pts': 50, 'modo_input': "📝 Edição Manual", 'busca_glossario': "",
+    'cen_nome': "", 'cen_nota': "", 'cen_visao': 'Mensal', 'cen_exibicao': "Lado a lado",
+    'real_inicio': pd.Timestamp.today().strftime('%Y-%m'), 'real_formato': "Padrão (, AAAA-MM-DD e 1234.56)", 'real_caminho': "", 'real_final': False, 'real_exibicao': "Lado a lado",
 }
 
-for k, v in defaults.items():
-    if k not in st.session_state: st.session_state[k] = v
+# Só a aba aberta renderiza seus widgets; reatribuir as chaves mantém os valores
+# das abas ocultas, que o Streamlit descartaria ao fim do rerun.
+for k, v in {**defaults, **ESTADO_UI}.items():
+    st.session_state[k] = st.session_state.get(k, v)
 
 # --- 5. FUNÇÕES ---
 def gerar_template_csv():
-    data = []
-    for k in defaults.keys():
-        data.append({'Parametro': key_map.get(k, k), 'Valor': st.session_state[k], 'Codigo_Interno': k})
-    return pd.DataFrame(data)
+    return template_parametros(Parametros.de_estado(st.session_state))
 
 def processar_upload(df_up):
     try:
-        count = 0
-        for index, row in df_up.iterrows():
-            codigo = row.get('Codigo_Interno')
-            if codigo and codigo in defaults: 
-                st.session_state[codigo] = float(row['Valor'])
-                count += 1
+        novos = valores_do_template(df_up)
+        st.session_state.update(novos)
+        count = len(novos)
         if count > 0:
             st.toast(f"✅ {count} campos atualizados com sucesso!", icon="🚀")
         else:
             st.error("Nenhum código válido encontrado no CSV.")
     except Exception as e: st.error(f"Erro ao processar: {e}")
 
-def calcular_dre():
-    s = st.session_state
-    meses = [f"Mês {i}" for i in range(1, 13)]
-    dados = []
-    
-    cli = s['cli_ini']
-    folha_base = (s['s_socio']*s['q_socio']) + (s['s_dev']*s['q_dev']) + (s['s_cs']*s['q_cs']) + (s['s_venda']*s['q_venda'])
-    nrr = 1 + s['upsell'] - s['churn']
-
-    for m in meses:
-        # Lógica de Growth
-        novos = int(cli * s['cresc'])
-        perda = int(cli * s['churn'])
-        fim = cli + novos - perda
-        
-        # Receita
-        mrr = fim * s['ticket']
-        rec_bruta = mrr * (1 + s['upsell'])
-        
-        # Variáveis
-        imp_val = rec_bruta * s['imposto']
-        rec_liq = rec_bruta - imp_val
-        cogs_val = fim * s['cogs']
-        comissao_val = rec_bruta * s['comissao']
-        taxa_val = rec_bruta * s['taxa']
-        
-        custos_var_total = cogs_val + comissao_val + taxa_val
-        margem = rec_liq - custos_var_total
-        
-        # Fixos
-        folha_tot = folha_base * (1 + s['encargos'])
-        fixos_op = folha_tot + s['mkt'] + s['outros']
-        
-        # Resultados
-        ebitda = margem - fixos_op
-        deprec_amort = s['deprec'] + s['amort']
-        ebit = ebitda - deprec_amort
-        lair = ebit + s['fin']
-        lucro = lair * (1 - s['irpj']) if lair > 0 else lair
-        
-        # KPIs (Protegidos contra div/0)
-        mc_pct = margem / rec_liq if rec_liq > 0 else 0
-        mb_pct = margem / rec_bruta if rec_bruta > 0 else 0
-        
-        fixos_totais_pe = fixos_op + deprec_amort - s['fin']
-        pe_val = fixos_totais_pe / mb_pct if mb_pct > 0 else 0
-        
-        fator_r = folha_tot / rec_bruta if rec_bruta > 0 else 0
-        
-        cac = (s['mkt'] + comissao_val) / novos if novos > 0 else 0
-        
-        ltv_num = s['ticket'] * mc_pct
-        ltv = ltv_num / s['churn'] if s['churn'] > 0 else 0
-        
-        payback = cac / ltv_num if ltv_num > 0 else 0
-        
-        dados.append({
-            'Mês': m,
-            '1. Clientes Ativos': fim, '1.1 Novos': novos, '1.2 Churn (Qtd)': perda, '1.3 Ticket Médio': s['ticket'],
-            '2. MRR (Recorrente)': mrr, '2.1 Receita Bruta': rec_bruta,
-            '(-) Impostos': imp_val,
-            '3. Receita Líquida': rec_liq,
-            '(-) COGS (Entrega)': cogs_val, '(-) Comissões/Taxas': comissao_val + taxa_val,
-            '4. Margem Contribuição': margem,
-            '(-) Folha + Encargos': folha_tot, '(-) Mkt + Fixos': s['mkt'] + s['outros'],
-            '5. EBITDA': ebitda,
-            '(-) Deprec/Amort': deprec_amort, '(+/-) Res. Financeiro': s['fin'],
-            '6. Lucro Líquido': lucro,
-            '7. Ponto Equilíbrio (R$)': pe_val, 'Fator R (%)': fator_r,
-            'CAC (R$)': cac, 'LTV (R$)': ltv, 'Payback (Meses)': payback, 'NRR (Estimado)': nrr
-        })
-        cli = fim
-    return pd.DataFrame(dados)
+def curvas_do_estado(estado):
+    """Curvas do motor de coortes configuradas no Dashboard (None se desligado)."""
+    if not estado['coorte_on']:
+        return None
+    cv = Curvas(*(estado[CHAVES_COORTE[k]] for k in Curvas._fields))
+    return cv._replace(idade_base=int(cv.idade_base))
+
+def ao_trocar_aba():
+    # O data_editor das metas sai de cena com a aba; as edições viram os dados base
+    if 'metas_editadas' in st.session_state:
+        st.session_state['metas_df'] = st.session_state.pop('metas_editadas')
+
+@st.cache_resource
+def repositorio():
+    return Repositorio()
+
+def salvar_cenario():
+    params_atuais, curvas_atuais, meses = Parametros.de_estado(st.session_state), curvas_do_estado(st.session_state), st.session_state['horizonte']
+    nome = st.session_state['cen_nome'].strip()
+    versao = repositorio().salvar(nome, params_atuais, meses, curvas_atuais, projecao_cacheada(params_atuais, meses, curvas_atuais), st.session_state['cen_nota'])
+    st.toast(f"✅ '{nome}' salvo como versão {versao}.", icon="💾")
+
+def aplicar_cenario(nome, versao):
+    cen = repositorio().carregar(nome, versao)
+    st.session_state.update(cen.params._asdict())
+    st.session_state['coorte_on'] = cen.curvas is not None
+    if cen.curvas is not None:
+        st.session_state.update({CHAVES_COORTE[k]: v for k, v in cen.curvas._asdict().items()})
+    st.session_state['horizonte'] = len(cen.df_raw)
+    st.toast(f"✅ Inputs de '{nome}' v{versao} carregados.", icon="📤")
+
+def exibir_comparacao(dif, rotulos, chave, arquivo):
+    """Tabela de uma `Diferenca` (lado a lado, Δ absoluto ou Δ %) e o CSV numérico."""
+    exibicao = st.radio("Comparação:", ["Lado a lado", "Δ absoluto", "Δ %"], horizontal=True, key=chave)
+    pct = dif.percentual.map(lambda x: "-" if np.isnan(x) else f"{x:+.1%}")
+    if exibicao == "Δ absoluto":
+        st.dataframe(formatar_dre(dif.absoluta), use_container_width=True, height=800)
+    elif exibicao == "Δ %":
+        st.dataframe(pct, use_container_width=True, height=800)
+    else:
+        partes = Diferenca(formatar_dre(dif.a), formatar_dre(dif.b), formatar_dre(dif.absoluta), pct)
+        st.dataframe(lado_a_lado(partes, rotulos), use_container_width=True, height=800)
+    st.download_button("📥 Baixar comparação (.csv)", lado_a_lado(dif, rotulos).to_csv().encode('utf-8'), arquivo, "text/csv")
+
+def ingerir_realizado():
+    """Lê o razão (arquivo no servidor, incremental, ou upload) para o Realizado da sessão."""
+    real = st.session_state.get('realizado')
+    try:
+        if real is None:
+            mapa = st.session_state.get('real_mapa')
+            if mapa is None:
+                raise ValueError("Envie o mapa de contas primeiro.")
+            real = Realizado(ler_mapa(pd.read_csv(mapa)), FORMATOS_RAZAO[st.session_state['real_formato']])
+        caminho = st.session_state['real_caminho'].strip()
+        up = st.session_state.get('real_upload')
+        if caminho:
+            if diretorio_razoes() is None:
+                raise ValueError(f"Leitura no servidor desligada (defina {DIRETORIO_ENV}).")
+            novas = real.ingerir(caminho_no_diretorio(caminho, diretorio_razoes()), final=st.session_state['real_final'])
+        elif up is not None:
+            # Mesmo nome = mesmo export cumulativo: só as linhas novas no fim são lidas
+            novas = real.ingerir(io.BytesIO(up.getvalue()), final=True, chave=f"upload:{up.name}")
+        else:
+            raise ValueError("Informe o caminho do razão ou envie o arquivo.")
+    except (KeyError, ValueError) as e:
+        st.toast(f"Erro no realizado: {e}", icon="⚠️")
+        return
+    except OSError:
+        # sem detalhes: a mensagem do sistema diria se o arquivo existe
+        st.toast("Erro no realizado: não foi possível ler o razão.", icon="⚠️")
+        return
+    st.session_state['realizado'] = real
+    st.toast(f"✅ {novas:,} lançamentos novos processados.", icon="📒")
+
+def limpar_realizado():
+    st.session_state.pop('realizado', None)
+
+@st.cache_data(show_spinner=False)
+def processar_portfolio(conteudo, nome, meses):
+    pf = validar(ler_arquivo(io.BytesIO(conteudo), nome))
+    tensor = projetar_portfolio(pf.params, meses)
+    return pf.problemas, consolidar(tensor), ranking(tensor, pf.params.index)
+
+@st.cache_data(show_spinner=False)
+def matriz_coortes(base, meses, curvas, relativa):
+    return receita_por_idade(projetar_curvas(base, curvas, meses), relativa)
+
+@st.cache_data(show_spinner=False)
+def simular_risco(base, desvios, tipo, n, por_mes, semente, meses):
+    dists = {k: distribuicao_relativa(tipo, getattr(base, k), d) for k, d in desvios if d > 0}
+    return simular(base, dists, n=n, meses=meses, por_mes=por_mes, semente=semente)
+
+@st.cache_data(show_spinner=False)
+def tornado_cacheado(base, delta, meses):
+    return tornado(base, delta, meses)
+
+@st.cache_data(show_spinner=False)
+def mapa_cacheado(base, chave_x, chave_y, amplitude, pontos, kpi, meses):
+    fatores = np.linspace(1 - amplitude, 1 + amplitude, pontos)
+    return mapa_calor(base, chave_x, getattr(base, chave_x) * fatores, chave_y, getattr(base, chave_y) * fatores, kpi, meses)
 
 # --- INTERFACE ---
-c1, c2 = st.columns([0.5, 6])
+c1, c2, c3 = st.columns([0.5, 5, 1])
 with c1: st.markdown("### 🚀")
 with c2: 
     st.markdown("### Vaiontec | Growth & Financial Intelligence")
     st.caption("Strategic Dashboard for CRO/CFO")
+with c3: horizonte = st.selectbox("Horizonte (meses)", [12, 24, 36, 60, 120], key='horizonte')
 
-tab_dash, tab_dre, tab_input, tab_gloss = st.tabs(["📊 Executive Dashboard", "📑 Relatório DRE (Corporate)", "⚙️ Inputs & Update", "📚 Knowledge Base"])
+# Abas com estado: só a aba aberta executa (figuras, tabela formatada, widgets, LaTeX)
+tab_dash, tab_dre, tab_sens, tab_input, tab_gloss = st.tabs(["📊 Executive Dashboard", "📑 Relatório DRE (Corporate)", "🎯 Sensibilidade", "⚙️ Inputs & Update", "📚 Knowledge Base"],
+                                                             key='aba', on_change=ao_trocar_aba)
 
-df_raw = calcular_dre()
-f = df_raw.iloc[-1]
+params = Parametros.de_estado(st.session_state)
 
 # --- ABA 1: DASHBOARD ---
-with tab_dash:
-    def card(label, val, sub, color="neutral", money=True):
-        v_str = f"R$ {val:,.2f}" if money else f"{val}"
-        st.markdown(f"""<div class="metric-container"><div class="metric-label">{label}</div>
-        <div class="metric-value">{v_str}</div><div class="metric-sub sub-{color}">{sub}</div></div>""", unsafe_allow_html=True)
-
-    c1, c2, c3, c4 = st.columns(4)
-    with c1: card("Faturamento Mensal", f['2.1 Receita Bruta'], "Projeção Mês 12", "neutral")
-    with c2: card("Lucro Líquido", f['6. Lucro Líquido'], f"Margem: {(f['6. Lucro Líquido']/f['2.1 Receita Bruta'])*100:.1f}%" if f['2.1 Receita Bruta']>0 else "0%", "good" if f['6. Lucro Líquido']>0 else "bad")
-    with c3: card("Caixa Mínimo (Break-Even)", f['7. Ponto Equilíbrio (R$)'], "Meta para 0x0", "neutral")
-    with c4: card("Base de Clientes", int(f['1. Clientes Ativos']), f"Novos: +{int(f['1.1 Novos'])}", "neutral", False)
-
-    c1, c2, c3, c4 = st.columns(4)
-    with c1: card("LTV", f['LTV (R$)'], "Lucro Vitalício")
-    with c2: card("CAC", f['CAC (R$)'], "Custo Aquisição")
-    with c3: card("Payback", f"{f['Payback (Meses)']:.1f} Meses", "Meta < 12", "good" if f['Payback (Meses)']<12 else "bad", False)
-    with c4: card("NRR (Retenção)", f"{f['NRR (Estimado)']*100:.1f}%", "Meta > 100%", "good" if f['NRR (Estimado)']>=1 else "bad", False)
-
-    st.markdown("---")
-    g1, g2 = st.columns([2, 1])
-    with g1:
-        fig = go.Figure()
-        fig.add_trace(go.Bar(x=df_raw['Mês'], y=df_raw['2.1 Receita Bruta'], name='Fat. Bruto', marker_color='#1f497d'))
-        fig.add_trace(go.Scatter(x=df_raw['Mês'], y=df_raw['7. Ponto Equilíbrio (R$)'], name='Break-Even', line=dict(color='#e74c3c', dash='dot')))
-        fig.add_trace(go.Scatter(x=df_raw['Mês'], y=df_raw['6. Lucro Líquido'], name='Lucro Líquido', line=dict(color='#2ecc71', width=3)))
-        fig.update_layout(template="plotly_white", height=400, margin=dict(t=20, b=20), legend=dict(orientation="h", y=1.1))
-        st.plotly_chart(fig, use_container_width=True)
-    with g2:
-        fig_u = go.Figure()
-        fig_u.add_trace(go.Bar(name='CAC', x=df_raw['Mês'], y=df_raw['CAC (R$)'], marker_color='#e67e22'))
-        fig_u.add_trace(go.Bar(name='LTV', x=df_raw['Mês'], y=df_raw['LTV (R$)'], marker_color='#2980b9'))
-        fig_u.update_layout(barmode='group', height=400, margin=dict(t=20, b=20), legend=dict(orientation="h", y=1.1))
-        st.plotly_chart(fig_u, use_container_width=True)
+with tab_dash, perfil.etapa('aba_dashboard'):
+    if tab_dash.open:
+        import plotly.graph_objects as go
+
+        # MOTOR DE COORTES: configurado antes da projeção; as curvas valem também para a aba DRE
+        with st.expander("👥 Motor de Coortes"):
+            if st.toggle("Usar curvas de churn e expansão por idade do cliente", key='coorte_on'):
+                k1, k2, k3, k4 = st.columns(4)
+                with k1:
+                    st.number_input("Churn inicial (%)", step=0.01, format="%.3f", min_value=0.0, max_value=1.0, key='coorte_churn_ini')
+                    st.number_input("Churn maduro (%)", step=0.01, format="%.3f", min_value=0.0, max_value=1.0, key='coorte_churn_fim')
+                with k2:
+                    st.number_input("Meia-vida churn (meses)", step=1.0, min_value=0.0, key='coorte_mv_churn')
+                    st.number_input("Meia-vida expansão (meses)", step=1.0, min_value=0.0, key='coorte_mv_exp')
+                with k3:
+                    st.number_input("Expansão inicial (%)", step=0.01, format="%.3f", min_value=0.0, key='coorte_exp_ini')
+                    st.number_input("Expansão madura (%)", step=0.01, format="%.3f", min_value=0.0, key='coorte_exp_fim')
+                with k4:
+                    st.number_input("Idade da base inicial (meses)", step=1, min_value=0, key='coorte_idade_base')
+                st.caption("Substitui churn/upsell planos na DRE. Monte Carlo, sensibilidade e goal seek seguem no motor agregado.")
+
+        curvas = curvas_do_estado(st.session_state)
+        with perfil.etapa('projecao'): df_raw = projecao_cacheada(params, horizonte, curvas)
+        f = df_raw.iloc[-1]
+
+        def card(label, val, sub, color="neutral", money=True):
+            v_str = f"R$ {val:,.2f}" if money else f"{val}"
+            st.markdown(f"""<div class="metric-container"><div class="metric-label">{label}</div>
+            <div class="metric-value">{v_str}</div><div class="metric-sub sub-{color}">{sub}</div></div>""", unsafe_allow_html=True)
 
-# --- ABA 2: DRE ---
-with tab_dre:
-    st.markdown("### 📑 Demonstrativo de Resultados")
-    df_dre = df_raw.set_index('Mês').T
-    
-    ordem = [
-        "1. Clientes Ativos", "1.1 Novos", "1.2 Churn (Qtd)", "1.3 Ticket Médio",
-        "2. MRR (Recorrente)", "2.1 Receita Bruta",
-        "(-) Impostos", "3. Receita Líquida",
-        "(-) COGS (Entrega)", "(-) Comissões/Taxas",
-        "4. Margem Contribuição",
-        "(-) Folha + Encargos", "(-) Mkt + Fixos",
-        "5. EBITDA",
-        "(-) Deprec/Amort", "(+/-) Res. Financeiro",
-        "6. Lucro Líquido",
-        "7. Ponto Equilíbrio (R$)", "Fator R (%)",
-        "CAC (R$)", "LTV (R$)", "Payback (Meses)", "NRR (Estimado)"
-    ]
-    df_dre = df_dre.reindex(ordem)
-    
-    def fmt(val, idx):
-        if pd.isna(val): return "-"
-        if any(x in idx for x in ['%', 'NRR', 'Fator']): return f"{val*100:.1f}%"
-        if any(x in idx for x in ['Clientes', 'Novos', 'Churn']): return f"{int(val)}"
-        if 'Meses' in idx: return f"{val:.1f}"
-        return f"R$ {val:,.2f}"
-
-    df_disp = df_dre.copy()
-    for col in df_disp.columns:
-        df_disp[col] = [fmt(v, i) for i, v in zip(df_disp.index, df_disp[col])]
-
-    st.dataframe(df_disp, use_container_width=True, height=800)
-    st.download_button("📥 Baixar DRE (.csv)", df_disp.to_csv().encode('utf-8'), "DRE_Vaiontec.csv", "text/csv")
-
-# --- ABA 3: INPUTS ---
-with tab_input:
-    # HELPER DE INPUT VISUAL
-    def input_box(key, label, desc, fmt="%.2f", step=0.01, min_val=0.0):
-        st.markdown(f"""
-        <div class='input-card'>
-            <div class='input-title'>{label}</div>
-            <div class='input-desc'>{desc}</div>
-        </div>
-        """, unsafe_allow_html=True)
-        # min_val=0.0 para aceitar zero. key=key para binding.
-        st.number_input(label, key=key, format=fmt, step=step, min_value=min_val, label_visibility="collapsed")
-
-    modo = st.radio("Método:", ["📝 Edição Manual", "📂 Upload Padrão"], horizontal=True)
-    st.markdown("---")
-
-    if modo == "📂 Upload Padrão":
-        c1, c2 = st.columns(2)
-        with c1:
-            st.info("Baixe a planilha com seus dados atuais, edite no Excel e suba novamente.")
-            df_tmpl = gerar_template_csv()
-            st.download_button("📥 Baixar Modelo (.csv)", df_tmpl.to_csv(index=False).encode('utf-8'), "modelo_inputs.csv", "text/csv")
-        with c2:
-            up = st.file_uploader("Upload .csv", type=['csv'])
-            if up: processar_upload(pd.read_csv(up))
-    else:
-        # COLUNA 1: RECEITA & VARIÁVEIS
         c1, c2, c3, c4 = st.columns(4)
-        
-        with c1:
-            st.markdown("<div class='input-group-title'>1. Receita (Top Line)</div>", unsafe_allow_html=True)
-            input_box('cli_ini', "Clientes Iniciais", "Base ativa no início.", "%.0f", 1.0)
-            input_box('cresc', "Crescimento (%)", "Taxa mensal de novos.", "%.2f", 0.01)
-            input_box('churn', "Churn (%)", "Taxa mensal de perda.", "%.2f", 0.01)
-            input_box('ticket', "Ticket Médio (R$)", "Valor da mensalidade.", "%.2f", 1.0)
-            input_box('upsell', "Upsell (%)", "Venda extra na base.", "%.2f", 0.01)
-
-        with c2:
-            st.markdown("<div class='input-group-title'>2. Variáveis</div>", unsafe_allow_html=True)
-            input_box('imposto', "Imposto Simples (%)", "Alíquota sobre NFs.")
-            input_box('cogs', "COGS Unit. (R$)", "Custo Cloud/Licença por cliente.")
-            input_box('comissao', "Comissão (%)", "Sobre vendas brutas.")
-            input_box('taxa', "Taxa Pagto (%)", "Taxa do Gateway/Boleto.")
-
-        with c3:
-            st.markdown("<div class='input-group-title'>3. Fixos & Mkt</div>", unsafe_allow_html=True)
-            input_box('mkt', "Budget Mkt (R$)", "Verba fixa de Ads/Mkt.")
-            input_box('outros', "Outros Fixos (R$)", "Aluguel, Softwares, etc.")
-            input_box('encargos', "Encargos Folha (%)", "FGTS, Férias (Simples ~35%).")
-
-        with c4:
-            st.markdown("<div class='input-group-title'>4. Pessoal & Contábil</div>", unsafe_allow_html=True)
-            # Folha Detalhada
-            with st.expander("Detalhar Salários", expanded=True):
-                c_s, c_q = st.columns([2,1])
-                with c_s:
-                    st.number_input("Sal. Sócio", key='s_socio', step=100.0)
-                    st.number_input("Sal. Dev", key='s_dev', step=100.0)
-                    st.number_input("Sal. CS", key='s_cs', step=100.0)
-                    st.number_input("Sal. Venda", key='s_venda', step=100.0)
-                with c_q:
-                    st.number_input("Qtd", key='q_socio', min_value=0, step=1)
-                    st.number_input("Qtd", key='q_dev', min_value=0, step=1)
-                    st.number_input("Qtd", key='q_cs', min_value=0, step=1)
-                    st.number_input("Qtd", key='q_venda', min_value=0, step=1)
-            
-            input_box('deprec', "Depreciação (R$)", "Perda valor equip.")
-            input_box('amort', "Amortização (R$)", "Perda valor software.")
-            input_box('fin', "Res. Financ. (R$)", "Juros (-) ou Rend (+).", min_val=None)
-
-# --- ABA 4: GLOSSÁRIO ---
-with tab_gloss:
-    st.markdown("### 🔍 Knowledge Base")
-    search = st.text_input("Pesquisar indicador...", "").lower()
-    st.markdown("---")
-    
-    for item in GLOSSARIO_DB:
-        if search in item['termo'].lower() or search in item['conceito'].lower() or search == "":
+        with c1: card("Faturamento Mensal", f['2.1 Receita Bruta'], f"Projeção Mês {horizonte}", "neutral")
+        with c2: card("Lucro Líquido", f['6. Lucro Líquido'], f"Margem: {(f['6. Lucro Líquido']/f['2.1 Receita Bruta'])*100:.1f}%" if f['2.1 Receita Bruta']>0 else "0%", "good" if f['6. Lucro Líquido']>0 else "bad")
+        with c3: card("Caixa Mínimo (Break-Even)", f['7. Ponto Equilíbrio (R$)'], "Meta para 0x0", "neutral")
+        with c4: card("Base de Clientes", int(f['1. Clientes Ativos']), f"Novos: +{int(f['1.1 Novos'])}", "neutral", False)
+
+        c1, c2, c3, c4 = st.columns(4)
+        with c1: card("LTV", f['LTV (R$)'], "Lucro Vitalício")
+        with c2: card("CAC", f['CAC (R$)'], "Custo Aquisição")
+        with c3: card("Payback", f"{f['Payback (Meses)']:.1f} Meses", "Meta < 12", "good" if f['Payback (Meses)']<12 else "bad", False)
+        with c4: card("NRR (Retenção)", f"{f['NRR (Estimado)']*100:.1f}%", "Meta > 100%", "good" if f['NRR (Estimado)']>=1 else "bad", False)
+
+        # MODO RISCO (MONTE CARLO)
+        mc = None
+        with st.expander("🎲 Modo Risco (Monte Carlo)"):
+            if st.toggle("Ativar simulação", key='mc_on'):
+                r1, r2, r3, r4 = st.columns(4)
+                with r1: mc_tipo = st.radio("Distribuição", ["normal", "triangular"], horizontal=True, key='mc_tipo')
+                with r2: mc_n = st.number_input("Caminhos", min_value=1000, max_value=200_000, step=5000, key='mc_n')
+                with r3: mc_seed = st.number_input("Semente", min_value=0, step=1, key='mc_seed')
+                if not 1 <= (st.session_state['mc_mes'] or 0) <= len(df_raw):
+                    st.session_state['mc_mes'] = len(df_raw)  # padrão ou horizonte encurtado
+                with r4: mc_mes = st.slider("Break-even até o mês", 1, len(df_raw), key='mc_mes')
+                mc_por_mes = st.checkbox("Sortear a cada mês", key='mc_por_mes')
+                d_cols = st.columns(len(VARIAVEIS))
+                desvios = tuple(
+                    (k, col.slider(f"Dispersão {key_map[k]} (%)", 0, 50, key=f'mc_d_{k}') / 100)
+                    for k, col in zip(VARIAVEIS, d_cols)
+                )
+                with perfil.etapa('monte_carlo'): mc = simular_risco(params, desvios, mc_tipo, int(mc_n), mc_por_mes, int(mc_seed), horizonte)
+                prob = mc.prob_equilibrio.iloc[mc_mes - 1]
+                card(f"P(Break-Even até Mês {mc_mes})", f"{prob*100:.1f}%", f"{int(mc_n):,} caminhos", "good" if prob >= 0.5 else "bad", False)
+                st.dataframe(mc.bandas.T.style.format("R$ {:,.2f}"), use_container_width=True)
+
+        st.markdown("---")
+        g1, g2 = st.columns([2, 1])
+        with g1, perfil.etapa('grafico_receita'):
+            fig = go.Figure()
+            fig.add_trace(go.Bar(x=df_raw['Mês'], y=df_raw['2.1 Receita Bruta'], name='Fat. Bruto', marker_color='#1f497d'))
+            if mc is not None:
+                for linha, nome, cor in [('2.1 Receita Bruta', 'Fat. Bruto', '31,73,125'), ('6. Lucro Líquido', 'Lucro', '46,204,113')]:
+                    b = mc.bandas[linha]
+                    fig.add_trace(go.Scatter(x=b.index, y=b['P90'], line=dict(width=0), showlegend=False, hoverinfo='skip'))
+                    fig.add_trace(go.Scatter(x=b.index, y=b['P10'], name=f'{nome} P10–P90', fill='tonexty', fillcolor=f'rgba({cor},0.15)', line=dict(width=0)))
+                    fig.add_trace(go.Scatter(x=b.index, y=b['P50'], name=f'{nome} P50', line=dict(color=f'rgb({cor})', dash='dash')))
+            fig.add_trace(go.Scatter(x=df_raw['Mês'], y=df_raw['7. Ponto Equilíbrio (R$)'], name='Break-Even', line=dict(color='#e74c3c', dash='dot')))
+            fig.add_trace(go.Scatter(x=df_raw['Mês'], y=df_raw['6. Lucro Líquido'], name='Lucro Líquido', line=dict(color='#2ecc71', width=3)))
+            fig.update_layout(template="plotly_white", height=400, margin=dict(t=20, b=20), legend=dict(orientation="h", y=1.1))
+            st.plotly_chart(fig, use_container_width=True)
+        with g2, perfil.etapa('grafico_unit_economics'):
+            fig_u = go.Figure()
+            fig_u.add_trace(go.Bar(name='CAC', x=df_raw['Mês'], y=df_raw['CAC (R$)'], marker_color='#e67e22'))
+            fig_u.add_trace(go.Bar(name='LTV', x=df_raw['Mês'], y=df_raw['LTV (R$)'], marker_color='#2980b9'))
+            fig_u.update_layout(barmode='group', height=400, margin=dict(t=20, b=20), legend=dict(orientation="h", y=1.1))
+            st.plotly_chart(fig_u, use_container_width=True)
+
+        if curvas is not None:
+            st.markdown("---")
+            relativa = st.radio("Mapa de coortes:", ["Retenção de receita (%)", "Receita (R$)"], horizontal=True, key='coorte_visao') == "Retenção de receita (%)"
+            with perfil.etapa('coortes'): mapa_c = matriz_coortes(params, horizonte, curvas, relativa)
+            fig_c = go.Figure(go.Heatmap(z=mapa_c.to_numpy(), x=mapa_c.columns, y=mapa_c.index, colorscale='Blues', hoverongaps=False))
+            fig_c.update_layout(height=500, margin=dict(t=20, b=20), xaxis_title="Idade (meses)", yaxis=dict(autorange='reversed'))
+            st.plotly_chart(fig_c, use_container_width=True)
+
+# --- ABA 2: DRE ---
+with tab_dre, perfil.etapa('aba_dre'):
+    if tab_dre.open:
+        curvas = curvas_do_estado(st.session_state)
+        st.markdown("### 📑 Demonstrativo de Resultados")
+        visao = st.radio("Visão:", list(PERIODOS), horizontal=True, key='visao_dre')
+        with perfil.etapa('tabela_dre'): df_dre, df_disp = tabela_cacheada(params, horizonte, visao, curvas)
+        with perfil.etapa('render_dre'): st.dataframe(df_disp, use_container_width=True, height=800)
+        st.download_button("📥 Baixar DRE (.csv)", df_dre.to_csv().encode('utf-8'), f"DRE_Vaiontec_{visao}.csv", "text/csv")
+        info, cenarios_cache = estatisticas(), projecao_cacheada.cache_info()
+        # hits/misses somam os dois caches; cenários são as projeções guardadas (a tabela reusa a mesma)
+        st.caption(f"Cache de projeções: {info.hits} hits · {info.misses} misses · {cenarios_cache.currsize}/{cenarios_cache.maxsize} cenários")
+
+        # REALIZADO x PLANO: razão do ERP agregado por mês, comparado com a projeção
+        with st.expander("📒 Realizado x Plano (razão do ERP)"):
+            r1, r2, r3 = st.columns(3)
+            with r1: st.file_uploader("Mapa de contas (.csv: Conta, Linha, Sinal)", type=['csv'], key='real_mapa')
+            with r2: st.text_input("Mês 1 do plano (AAAA-MM)", key='real_inicio')
+            with r3: st.selectbox("Formato do razão", list(FORMATOS_RAZAO), key='real_formato')
+            st.caption(f"Colunas esperadas: {Formato().data}, {Formato().conta}, {Formato().valor}. Linhas do mapa: {', '.join(DESTINOS)}. "
+                       "Prefixo mais longo vence; Sinal -1 inverte o saldo da conta.")
+            r1, r2 = st.columns(2)
+            with r1:
+                if diretorio_razoes() is None:
+                    st.caption(f"Leitura de razões no servidor desligada (defina {DIRETORIO_ENV}).")
+                else:
+                    st.text_input(f"Razão no servidor (relativo a {DIRETORIO_ENV}; reler processa só as linhas novas)", key='real_caminho')
+                    st.checkbox("Export concluído (lê também a última linha sem quebra)", key='real_final')
+            with r2: st.file_uploader("...ou upload do razão (.csv)", type=['csv'], key='real_upload',
+                                      help="Reenviar um export com o mesmo nome lê só as linhas acrescentadas no fim; "
+                                           "um arquivo com o início diferente é recusado (use Recomeçar).")
+            b1, b2 = st.columns([1, 5])
+            with b1: st.button("📒 Ingerir / atualizar", on_click=ingerir_realizado)
+            with b2: st.button("🗑️ Recomeçar", on_click=limpar_realizado)
+
+            real = st.session_state.get('realizado')
+            if real is not None:
+                st.caption(f"{real.linhas:,} lançamentos lidos · {real.rejeitadas:,} rejeitados (data/valor ilegível) · "
+                           f"{len(real.meses)} meses · {len(real.nao_mapeadas)} conta(s) sem mapa")
+                if real.pendente():
+                    st.warning(f"{sum(real.pendente().values()):,} byte(s) no fim do razão sem quebra de linha ainda não lidos: "
+                               "marque 'Export concluído' e atualize se o arquivo já terminou.")
+                if real.nao_mapeadas:
+                    st.dataframe(pd.Series(real.nao_mapeadas, name='Valor ignorado').rename_axis('Conta'), use_container_width=True, height=150)
+                try:
+                    with perfil.etapa('variancia'): dif = variancia(projecao_cacheada(params, horizonte, curvas), real, st.session_state['real_inicio'], visao)
+                except ValueError as e:
+                    st.error(f"Mês inicial inválido: {e}")
+                else:
+                    if visao != 'Mensal':
+                        st.caption("Períodos com realizado só em parte dos meses comparam o acumulado desses meses.")
+                    exibir_comparacao(dif, ("Plano", "Realizado"), 'real_exibicao', f"DRE_Plano_x_Realizado_{visao}.csv")
+
+# --- ABA 3: SENSIBILIDADE ---
+with tab_sens, perfil.etapa('aba_sensibilidade'):
+    if tab_sens.open:
+        import plotly.graph_objects as go
+
+        st.markdown("### 🎯 Análise de Sensibilidade")
+        s1, s2 = st.columns(2)
+        with s1: delta = st.slider("Variação de cada input (±%)", 1, 50, key='sens_delta') / 100
+        with s2: kpi = st.selectbox(f"Indicador (Mês {horizonte})", KPIS, key='sens_kpi')
+
+        with perfil.etapa('tornado'): res_t = tornado_cacheado(params, delta, horizonte)
+        ordem_imp = ordenar_por_impacto(res_t, kpi).index[::-1]
+        base_kpi = res_t.base[kpi]
+        nomes = [key_map.get(k, k) for k in ordem_imp]
+        fig_t = go.Figure()
+        fig_t.add_trace(go.Bar(y=nomes, x=res_t.baixo.loc[ordem_imp, kpi] - base_kpi, base=base_kpi, orientation='h', name=f'-{delta*100:.0f}%', marker_color='#e67e22'))
+        fig_t.add_trace(go.Bar(y=nomes, x=res_t.alto.loc[ordem_imp, kpi] - base_kpi, base=base_kpi, orientation='h', name=f'+{delta*100:.0f}%', marker_color='#2980b9'))
+        fig_t.update_layout(barmode='overlay', template="plotly_white", height=650, margin=dict(t=20, b=20), legend=dict(orientation="h", y=1.05))
+        st.plotly_chart(fig_t, use_container_width=True)
+
+        st.markdown("---")
+        st.markdown("#### Mapa de Calor")
+        h1, h2, h3, h4 = st.columns(4)
+        chaves = list(defaults)
+        with h1: chave_x = st.selectbox("Eixo X", chaves, format_func=key_map.get, key='sens_x')
+        with h2: chave_y = st.selectbox("Eixo Y", chaves, format_func=key_map.get, key='sens_y')
+        with h3: amplitude = st.slider("Amplitude (±%)", 5, 90, key='sens_amp') / 100
+        with h4: pontos = st.slider("Pontos por eixo", 5, 100, key='sens_pts')
+        if chave_x == chave_y:
+            st.warning("Escolha dois parâmetros diferentes.")
+        else:
+            with perfil.etapa('mapa_calor'): mapa = mapa_cacheado(params, chave_x, chave_y, amplitude, pontos, kpi, horizonte)
+            fig_h = go.Figure(go.Heatmap(z=mapa.to_numpy(), x=mapa.columns, y=mapa.index, colorscale='RdYlGn', colorbar=dict(title=kpi)))
+            fig_h.update_layout(height=500, margin=dict(t=20, b=20), xaxis_title=key_map[chave_x], yaxis_title=key_map[chave_y])
+            st.plotly_chart(fig_h, use_container_width=True)
+
+        st.markdown("---")
+        st.markdown("#### Goal Seek")
+        st.caption("Qual valor de input faz a linha da DRE atingir a meta no mês escolhido? Todas as metas são resolvidas juntas.")
+        if 'metas_df' not in st.session_state:
+            st.session_state['metas_df'] = pd.DataFrame([
+                {'Input': 'cresc', 'Linha DRE': '6. Lucro Líquido', 'Mês': min(9, horizonte), 'Sentido': '>=', 'Meta': 0.0},
+                {'Input': 'mkt', 'Linha DRE': 'Payback (Meses)', 'Mês': horizonte, 'Sentido': '<=', 'Meta': 12.0},
+            ])
+        df_metas = st.data_editor(st.session_state['metas_df'], num_rows="dynamic", use_container_width=True, column_config={
+            'Input': st.column_config.SelectboxColumn(options=list(defaults), required=True),
+            'Linha DRE': st.column_config.SelectboxColumn(options=ORDEM, required=True),
+            'Mês': st.column_config.NumberColumn(min_value=1, max_value=horizonte, step=1, required=True),
+            'Sentido': st.column_config.SelectboxColumn(options=['>=', '<='], required=True),
+            'Meta': st.column_config.NumberColumn(required=True),
+        }, key='metas_editor')
+        st.session_state['metas_editadas'] = df_metas
+        validas = df_metas.dropna()
+        if not validas.empty:
+            with perfil.etapa('goal_seek'): resultados = resolver(params, [Meta(r['Input'], r['Linha DRE'], int(r['Mês']), float(r['Meta']), r['Sentido']) for _, r in validas.iterrows()])
+            st.dataframe(pd.DataFrame([{
+                'Input': key_map.get(r.meta.chave, r.meta.chave), 'Atual': getattr(params, r.meta.chave),
+                'Necessário': r.valor, 'Linha DRE': r.meta.linha, 'Mês': r.meta.mes,
+                'Resultado': r.kpi, 'Meta': f"{r.meta.sentido} {r.meta.alvo:,.2f}",
+            } for r in resultados]), use_container_width=True, hide_index=True)
+
+# --- ABA 4: INPUTS ---
+with tab_input, perfil.etapa('aba_inputs'):
+    if tab_input.open:
+        # HELPER DE INPUT VISUAL
+        def input_box(key, label, desc, fmt="%.2f", step=0.01, min_val=0.0):
             st.markdown(f"""
-            <div class="glossary-card">
-                <div class="glossary-term">{item['termo']} <span class="glossary-cat">{item['categoria']}</span></div>
-                <div class="glossary-desc">{item['conceito']}</div>
-                <div class="glossary-tip">💡 {item['interpretacao']}</div>
+            <div class='input-card'>
+                <div class='input-title'>{label}</div>
+                <div class='input-desc'>{desc}</div>
             </div>
             """, unsafe_allow_html=True)
-            # FÓRMULA COM ST.LATEX (AQUI ESTAVA O ERRO ANTERIOR)
-            st.latex(item['formula'])
+            # min_val=0.0 para aceitar zero. key=key para binding.
+            st.number_input(label, key=key, format=fmt, step=step, min_value=min_val, label_visibility="collapsed")
+
+        modo = st.radio("Método:", ["📝 Edição Manual", "📂 Upload Padrão", "🏢 Portfólio", "💾 Cenários"], horizontal=True, key='modo_input')
+        st.markdown("---")
+
+        if modo == "📂 Upload Padrão":
+            c1, c2 = st.columns(2)
+            with c1:
+                st.info("Baixe a planilha com seus dados atuais, edite no Excel e suba novamente.")
+                df_tmpl = gerar_template_csv()
+                st.download_button("📥 Baixar Modelo (.csv)", df_tmpl.to_csv(index=False).encode('utf-8'), "modelo_inputs.csv", "text/csv")
+            with c2:
+                up = st.file_uploader("Upload .csv", type=['csv'])
+                if up:
+                    with perfil.etapa('processar_upload'): processar_upload(pd.read_csv(up))
+        elif modo == "🏢 Portfólio":
+            c1, c2 = st.columns(2)
+            with c1:
+                st.info("Um arquivo com várias empresas: o modelo padrão com a coluna 'Empresa' (formato longo) ou uma linha por empresa com uma coluna por Codigo_Interno (formato largo).")
+                df_tmpl = gerar_template_csv()
+                df_tmpl.insert(0, 'Empresa', 'Empresa A')
+                st.download_button("📥 Baixar Modelo Portfólio (.csv)", df_tmpl.to_csv(index=False).encode('utf-8'), "modelo_portfolio.csv", "text/csv")
+            with c2:
+                up = st.file_uploader("Upload .csv / .parquet", type=['csv', 'parquet'], key='up_portfolio')
+            if up:
+                try:
+                    with perfil.etapa('portfolio'): problemas, consolidado, rank = processar_portfolio(up.getvalue(), up.name, horizonte)
+                except Exception as e:
+                    st.error(f"Erro ao processar: {e}")
+                else:
+                    if not problemas.empty:
+                        st.warning(f"{len(problemas)} problema(s) encontrados; empresas com valores inválidos foram descartadas.")
+                        st.dataframe(problemas, use_container_width=True, hide_index=True)
+                    st.markdown(f"<div class='input-group-title'>Ranking ({len(rank)} empresas · Mês {horizonte})</div>", unsafe_allow_html=True)
+                    st.dataframe(rank.style.format({'LTV/CAC': "{:.1f}x", 'NRR': "{:.1%}", 'Payback (Meses)': "{:.1f}", 'Clientes': "{:,.0f}",
+                                                    'Receita Bruta': "R$ {:,.2f}", 'EBITDA': "R$ {:,.2f}", 'Lucro Líquido': "R$ {:,.2f}"}), use_container_width=True)
+                    st.markdown("<div class='input-group-title'>DRE Consolidada do Portfólio</div>", unsafe_allow_html=True)
+                    st.dataframe(formatar_dre(consolidado), use_container_width=True, height=800)
+                    st.download_button("📥 Baixar DRE Consolidada (.csv)", consolidado.to_csv().encode('utf-8'), "DRE_Portfolio.csv", "text/csv")
+        elif modo == "💾 Cenários":
+            repo = repositorio()
+            c1, c2 = st.columns(2)
+            with c1:
+                st.markdown("<div class='input-group-title'>Salvar inputs atuais</div>", unsafe_allow_html=True)
+                st.text_input("Nome do cenário", key='cen_nome')
+                st.text_input("Nota (opcional)", key='cen_nota')
+                st.button("💾 Salvar nova versão", on_click=salvar_cenario, disabled=not st.session_state['cen_nome'].strip())
+            with c2:
+                st.markdown("<div class='input-group-title'>Cenários salvos</div>", unsafe_allow_html=True)
+                st.dataframe(repo.listar(limite=200), use_container_width=True, hide_index=True, height=250)
+
+            nomes = repo.nomes()
+            if nomes:
+                st.markdown("---")
+                visao_c = st.radio("Visão:", list(PERIODOS), horizontal=True, key='cen_visao')
+                ca, cb = st.columns(2)
+                escolhidos = []
+                for col, rotulo in [(ca, 'A'), (cb, 'B')]:
+                    with col:
+                        nome = st.selectbox(f"Cenário {rotulo}", nomes, key=f'cen_{rotulo}_nome')
+                        versao = st.selectbox(f"Versão {rotulo}", repo.listar(nome)['versao'], key=f'cen_{rotulo}_versao')
+                        st.button(f"📤 Carregar {rotulo} nos inputs", key=f'cen_{rotulo}_aplicar', on_click=aplicar_cenario, args=(nome, versao))
+                        escolhidos.append(repo.carregar(nome, versao))
+                cen_a, cen_b = escolhidos
+                with perfil.etapa('comparar_cenarios'): dif = comparar(tabela_dre(cen_a.df_raw, visao_c), tabela_dre(cen_b.df_raw, visao_c))
+                exibir_comparacao(dif, (f"{cen_a.nome} v{cen_a.versao}", f"{cen_b.nome} v{cen_b.versao}"), 'cen_exibicao', "DRE_Comparacao.csv")
+        else:
+            # COLUNA 1: RECEITA & VARIÁVEIS
+            c1, c2, c3, c4 = st.columns(4)
+        
+            with c1:
+                st.markdown("<div class='input-group-title'>1. Receita (Top Line)</div>", unsafe_allow_html=True)
+                input_box('cli_ini', "Clientes Iniciais", "Base ativa no início.", "%.0f", 1.0)
+                input_box('cresc', "Crescimento (%)", "Taxa mensal de novos.", "%.2f", 0.01)
+                input_box('churn', "Churn (%)", "Taxa mensal de perda.", "%.2f", 0.01)
+                input_box('ticket', "Ticket Médio (R$)", "Valor da mensalidade.", "%.2f", 1.0)
+                input_box('upsell', "Upsell (%)", "Venda extra na base.", "%.2f", 0.01)
+
+            with c2:
+                st.markdown("<div class='input-group-title'>2. Variáveis</div>", unsafe_allow_html=True)
+                input_box('imposto', "Imposto Simples (%)", "Alíquota sobre NFs.")
+                input_box('cogs', "COGS Unit. (R$)", "Custo Cloud/Licença por cliente.")
+                input_box('comissao', "Comissão (%)", "Sobre vendas brutas.")
+                input_box('taxa', "Taxa Pagto (%)", "Taxa do Gateway/Boleto.")
+
+            with c3:
+                st.markdown("<div class='input-group-title'>3. Fixos & Mkt</div>", unsafe_allow_html=True)
+                input_box('mkt', "Budget Mkt (R$)", "Verba fixa de Ads/Mkt.")
+                input_box('outros', "Outros Fixos (R$)", "Aluguel, Softwares, etc.")
+                input_box('encargos', "Encargos Folha (%)", "FGTS, Férias (Simples ~35%).")
+
+            with c4:
+                st.markdown("<div class='input-group-title'>4. Pessoal & Contábil</div>", unsafe_allow_html=True)
+                # Folha Detalhada
+                with st.expander("Detalhar Salários", expanded=True):
+                    c_s, c_q = st.columns([2,1])
+                    with c_s:
+                        st.number_input("Sal. Sócio", key='s_socio', step=100.0)
+                        st.number_input("Sal. Dev", key='s_dev', step=100.0)
+                        st.number_input("Sal. CS", key='s_cs', step=100.0)
+                        st.number_input("Sal. Venda", key='s_venda', step=100.0)
+                    with c_q:
+                        st.number_input("Qtd", key='q_socio', min_value=0, step=1)
+                        st.number_input("Qtd", key='q_dev', min_value=0, step=1)
+                        st.number_input("Qtd", key='q_cs', min_value=0, step=1)
+                        st.number_input("Qtd", key='q_venda', min_value=0, step=1)
+            
+                input_box('deprec', "Depreciação (R$)", "Perda valor equip.")
+                input_box('amort', "Amortização (R$)", "Perda valor software.")
+                input_box('fin', "Res. Financ. (R$)", "Juros (-) ou Rend (+).", min_val=None)
+
+# --- ABA 5: GLOSSÁRIO ---
+with tab_gloss, perfil.etapa('aba_glossario'):
+    if tab_gloss.open:
+        st.markdown("### 🔍 Knowledge Base")
+        search = st.text_input("Pesquisar indicador...", key='busca_glossario').lower()
+        st.markdown("---")
+    
+        for item in GLOSSARIO_DB:
+            if search in item['termo'].lower() or search in item['conceito'].lower() or search == "":
+                st.markdown(f"""
+                <div class="glossary-card">
+                    <div class="glossary-term">{item['termo']} <span class="glossary-cat">{item['categoria']}</span></div>
+                    <div class="glossary-desc">{item['conceito']}</div>
+                    <div class="glossary-tip">💡 {item['interpretacao']}</div>
+                </div>
+                """, unsafe_allow_html=True)
+                # FÓRMULA COM ST.LATEX (AQUI ESTAVA O ERRO ANTERIOR)
+                st.latex(item['formula'])
+
+# --- PERFIL DE EXECUÇÃO (DEBUG) ---
+if perfil.ativo:
+    historico = st.session_state.setdefault('perfil_hist', novo_historico())
+    registro = perfil.finalizar(historico, aba=st.session_state['aba'], horizonte=horizonte, cache=estatisticas()._asdict())
+    pico = "" if registro['pico_kb'] is None else f" · pico {registro['pico_kb']:,.0f} KB"
+    with st.expander(f"🛠️ Perfil do rerun: {registro['total_ms']:.1f} ms{pico}", expanded=True):
+        etapas = pd.DataFrame(registro['etapas'], columns=['etapa', 'nivel', 'ms', 'alocado_kb'])
+        if registro['pico_kb'] is None:
+            etapas = etapas.drop(columns='alocado_kb')
+        etapas['etapa'] = etapas['nivel'].map(lambda n: "\u2003" * n) + etapas['etapa']
+        st.dataframe(etapas.drop(columns='nivel').style.format({'ms': "{:.2f}", 'alocado_kb': "{:,.1f}"}), use_container_width=True, hide_index=True)
+        serie = pd.DataFrame([{'total_ms': r['total_ms'], **{e['etapa']: e['ms'] for e in r['etapas'] if e['nivel'] == 0}} for r in historico])
+        st.line_chart(serie, height=250)
+        jsonl = "\n".join(json.dumps(r, ensure_ascii=False, default=str) for r in historico)
+        st.download_button("📥 Histórico (.jsonl)", jsonl.encode('utf-8'), "perfil_reruns.jsonl", "application/json")
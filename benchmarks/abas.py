@@ -0,0 +1,86 @@
+"""Custo de renderização do app por aba (AppTest, sem navegador).
+
+Uso (na raiz do repositório):
+
+    python -m benchmarks.abas                    # app.py atual
+    python -m benchmarks.abas --app antigo.py    # outra versão, para comparar
+    python -m benchmarks.abas --json
+
+Para cada aba, um processo novo roda o script com a aba selecionada: `frio_ms`
+é a primeira execução (importações, compilação do script e caches vazios
+incluídos) e `rerun_ms` a mediana das execuções seguintes, como numa interação
+do usuário. Em versões
+sem abas preguiçosas todas as abas são executadas a cada rerun e os tempos
+ficam iguais entre elas.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP = Path(__file__).resolve().parent.parent / 'app.py'
+CHAVE_ABA = 'aba'
+
+
+def _app_test(app):
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import AppTest, local_script_runner
+
+    # O servidor compila o script uma vez; o AppTest recompilaria a cada run
+    cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: cache
+    return AppTest.from_file(str(Path(app).resolve()), default_timeout=120)
+
+
+def medir_aba(app, aba, repeticoes):
+    """Tempo da primeira execução e mediana dos reruns com `aba` selecionada (ms)."""
+    def rodar():
+        # AppTest não clica em abas: a seleção vai pelo session_state a cada execução
+        at.session_state[CHAVE_ABA] = aba
+        at.run()
+
+    inicio = time.perf_counter()
+    at = _app_test(app)
+    rodar()
+    frio = time.perf_counter() - inicio
+    if at.exception:
+        raise RuntimeError(f"{aba}: {at.exception[0].message}")
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        rodar()
+        tempos.append(time.perf_counter() - inicio)
+    return {'aba': aba, 'frio_ms': 1000 * frio, 'rerun_ms': 1000 * float(np.median(tempos)), 'repeticoes': repeticoes}
+
+
+def abas(app):
+    at = _app_test(app).run()
+    return [t.label for t in at.tabs]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--app', default=str(APP), help='script Streamlit a medir')
+    ap.add_argument('--repeticoes', type=int, default=10)
+    ap.add_argument('--json', action='store_true', help='saída em JSON lines')
+    ap.add_argument('--aba', help=argparse.SUPPRESS)  # execução interna, um processo por aba
+    args = ap.parse_args(argv)
+
+    if args.aba is not None:
+        print(json.dumps(medir_aba(args.app, args.aba, args.repeticoes)))
+        return 0
+
+    for aba in abas(args.app):
+        saida = subprocess.run([sys.executable, '-m', 'benchmarks.abas', '--app', args.app, '--aba', aba,
+                                '--repeticoes', str(args.repeticoes)], capture_output=True, text=True, check=True)
+        r = json.loads(saida.stdout.strip().splitlines()[-1])
+        print(json.dumps(r, ensure_ascii=False) if args.json else f"{r['aba']:<32} frio {r['frio_ms']:>9.1f} ms   rerun {r['rerun_ms']:>8.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Benchmark headless do modelo de projeção e guarda de regressão numérica.
+
+Uso (na raiz do repositório, sem `streamlit run`):
+
+    python -m benchmarks.bench                 # tempos e pico de memória por etapa
+    python -m benchmarks.bench --rapido        # lotes menores, para rodar a cada mudança
+    python -m benchmarks.bench --verificar     # só compara com os números dourados
+    python -m benchmarks.bench --json          # saída em JSON lines
+    python -m benchmarks.bench --gerar-golden  # regrava o fixture (mudança intencional da matemática)
+
+`golden_defaults.csv` guarda a DRE de 12 meses dos `defaults` como era calculada
+pelo `calcular_dre` original; qualquer motor novo deve reproduzi-la linha a linha.
+"""
+import argparse
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from lote import avaliar_lote, montar_grade
+from modelo import ORDEM, Parametros
+from monte_carlo import VARIAVEIS, distribuicao_relativa, simular
+from realizado import LANCAVEIS, Realizado, Regra
+from relatorio import dre_dataframe, formatar_dre, tabela_dre, template_parametros, valores_do_template
+
+GOLDEN = Path(__file__).with_name('golden_defaults.csv')
+RTOL, ATOL = 1e-9, 1e-6
+
+
+def medir(nome, func, repeticoes):
+    """Mediana do tempo por chamada (ms) e pico de memória alocada (MB) de uma etapa."""
+    func()  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    func()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'etapa': nome, 'ms': 1000 * float(np.median(tempos)), 'pico_mb': pico / 2**20, 'repeticoes': repeticoes}
+
+
+def _roundtrip_template():
+    csv = template_parametros(Parametros()).to_csv(index=False)
+    return Parametros(**valores_do_template(pd.read_csv(io.StringIO(csv))))
+
+
+def _razao_sintetico(n, diretorio, semente=0):
+    """CSV em `diretorio` com `n` lançamentos em 12 meses e o mapa de contas correspondente."""
+    rng = np.random.default_rng(semente)
+    contas = [f"{i + 3}.{j}" for i in range(len(LANCAVEIS)) for j in range(1, 6)]
+    datas = pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 365, n), unit='D')
+    caminho = Path(diretorio) / 'razao.csv'
+    pd.DataFrame({'Data': datas.strftime('%Y-%m-%d'), 'Conta': rng.choice(contas, n),
+                  'Valor': rng.normal(100, 30, n).round(2)}).to_csv(caminho, index=False)
+    return caminho, [Regra(f"{i + 3}.", linha) for i, linha in enumerate(LANCAVEIS)]
+
+
+def etapas(diretorio, rapido=False):
+    """(nome, função, repetições) de cada etapa; arquivos de entrada vão para `diretorio`."""
+    p = Parametros()
+    df_12, df_120 = dre_dataframe(p, 12), dre_dataframe(p, 120)
+    tab_12, tab_120 = tabela_dre(df_12), tabela_dre(df_120)
+    n_lote = 10_000 if rapido else 100_000
+    grade = montar_grade(p, cresc=np.linspace(0, 0.3, n_lote // 100), churn=np.linspace(0, 0.1, 100))
+    dists = {k: distribuicao_relativa('normal', getattr(p, k), 0.2) for k in VARIAVEIS}
+    n_mc = 5_000 if rapido else 50_000
+    n_razao = 100_000 if rapido else 1_000_000
+    razao, regras = _razao_sintetico(n_razao, diretorio)
+    return [
+        ('projecao_12m', lambda: dre_dataframe(p, 12), 200),
+        ('tabela_dre_12m', lambda: tabela_dre(df_12), 200),
+        ('formatacao_12m', lambda: formatar_dre(tab_12), 200),
+        ('template_roundtrip', _roundtrip_template, 100),
+        ('projecao_120m', lambda: dre_dataframe(p, 120), 100),
+        ('tabela_dre_120m_anual', lambda: tabela_dre(df_120, 'Anual'), 100),
+        ('formatacao_120m', lambda: formatar_dre(tab_120), 50),
+        (f'lote_{n_lote}', lambda: avaliar_lote(grade), 3),
+        (f'monte_carlo_{n_mc}', lambda: simular(p, dists, n=n_mc), 3),
+        (f'razao_{n_razao}', lambda: Realizado(regras).ingerir(razao, bloco=200_000), 3),
+    ]
+
+
+def verificar_golden():
+    """Compara a projeção atual dos `defaults` com o fixture; retorna a lista de divergências."""
+    esperado = pd.read_csv(GOLDEN).set_index('Mês')
+    atual = dre_dataframe(Parametros(), len(esperado)).set_index('Mês')
+    divergencias = []
+    for linha in ORDEM:
+        a, e = atual[linha].to_numpy(dtype=float), esperado[linha].to_numpy(dtype=float)
+        for mes in np.flatnonzero(~np.isclose(a, e, rtol=RTOL, atol=ATOL)):
+            divergencias.append({'linha': linha, 'mes': esperado.index[mes], 'esperado': float(e[mes]), 'atual': float(a[mes])})
+    return divergencias
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--rapido', action='store_true', help='lotes e simulações menores')
+    ap.add_argument('--verificar', action='store_true', help='apenas a verificação do fixture dourado')
+    ap.add_argument('--json', action='store_true', help='saída em JSON lines')
+    ap.add_argument('--gerar-golden', action='store_true', help='regrava golden_defaults.csv com o motor atual')
+    args = ap.parse_args(argv)
+
+    if args.gerar_golden:
+        dre_dataframe(Parametros(), 12).to_csv(GOLDEN, index=False)
+        print(f"Fixture regravado: {GOLDEN}")
+        return 0
+
+    if not args.verificar:
+        with tempfile.TemporaryDirectory() as tmp:
+            for nome, func, repeticoes in etapas(tmp, args.rapido):
+                r = medir(nome, func, repeticoes)
+                print(json.dumps(r) if args.json else f"{r['etapa']:<24} {r['ms']:>10.3f} ms   pico {r['pico_mb']:>8.2f} MB")
+
+    divergencias = verificar_golden()
+    if args.json:
+        print(json.dumps({'golden': 'ok' if not divergencias else 'falhou', 'divergencias': divergencias}))
+    elif divergencias:
+        print(f"\nGolden: {len(divergencias)} divergência(s)")
+        for d in divergencias:
+            print(f"  {d['linha']} / {d['mes']}: esperado {d['esperado']!r}, atual {d['atual']!r}")
+    else:
+        print("\nGolden: ok (DRE dos defaults idêntica ao fixture)")
+    return 1 if divergencias else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""Cache LRU da projeção e da tabela DRE formatada.
+
+A chave é a tupla `Parametros` com os valores atuais das chaves de `defaults`
+(mais horizonte, visão e curvas de coorte): reruns que não alteram inputs do modelo (busca no
+glossário, troca de aba ou de modo de input) reaproveitam o resultado. O cache
+vive no módulo, então sobrevive aos reruns do Streamlit e é compartilhado
+entre sessões.
+"""
+from functools import lru_cache
+
+from relatorio import dre_dataframe, formatar_dre, tabela_dre
+
+TAMANHO = 64  # cenários recentes mantidos em memória
+
+
+@lru_cache(maxsize=TAMANHO)
+def projecao_cacheada(params, meses=12, curvas=None):
+    """Projeção mensal (df_raw). O DataFrame é compartilhado: não altere in-place."""
+    return dre_dataframe(params, meses, curvas)
+
+
+@lru_cache(maxsize=TAMANHO)
+def tabela_cacheada(params, meses=12, periodo='Mensal', curvas=None):
+    """Retorna (df_dre numérica, df_disp formatada) na visão pedida, reaproveitando a projeção cacheada."""
+    df_dre = tabela_dre(projecao_cacheada(params, meses, curvas), periodo)
+    return df_dre, formatar_dre(df_dre)
+
+
+def estatisticas():
+    """Contadores somados dos caches: hits, misses, currsize e maxsize."""
+    infos = [projecao_cacheada.cache_info(), tabela_cacheada.cache_info()]
+    return infos[0]._replace(**{campo: sum(getattr(i, campo) for i in infos) for campo in infos[0]._fields})
+
+
+def limpar():
+    projecao_cacheada.cache_clear()
+    tabela_cacheada.cache_clear()
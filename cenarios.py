@@ -0,0 +1,165 @@
+"""Repositório local de cenários: versões nomeadas de parâmetros e suas projeções.
+
+Cada `salvar` grava uma nova versão (1, 2, ...) do cenário num arquivo SQLite,
+com os parâmetros, as curvas de coorte (se houver) e a projeção mensal já
+calculada (float64 em bytes), de modo que `carregar` não roda o motor. A
+listagem lê só os metadados, pelos índices de nome/versão e data.
+"""
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from coortes import Curvas
+from modelo import ORDEM, Parametros, rotulos_meses
+from relatorio import dre_dataframe
+
+CAMINHO_PADRAO = Path(__file__).with_name('cenarios.db')
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS cenarios (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL,
+    versao INTEGER NOT NULL,
+    criado_em REAL NOT NULL,
+    meses INTEGER NOT NULL,
+    params TEXT NOT NULL,
+    curvas TEXT,
+    linhas TEXT NOT NULL,
+    projecao BLOB NOT NULL,
+    nota TEXT NOT NULL DEFAULT '',
+    UNIQUE (nome, versao)
+);
+CREATE INDEX IF NOT EXISTS idx_cenarios_criado_em ON cenarios (criado_em);
+"""
+_META = "nome, versao, criado_em, meses, nota"
+
+
+class Cenario(NamedTuple):
+    nome: str
+    versao: int
+    criado_em: pd.Timestamp
+    params: Parametros
+    curvas: Curvas            # None: motor agregado
+    df_raw: pd.DataFrame      # projeção mensal, como `dre_dataframe`
+    nota: str = ''
+
+
+class Diferenca(NamedTuple):
+    a: pd.DataFrame           # DRE de cada cenário nos períodos comuns
+    b: pd.DataFrame
+    absoluta: pd.DataFrame    # b - a
+    percentual: pd.DataFrame  # (b - a) / |a|; NaN onde a == 0
+
+
+class Repositorio:
+    """Cenários versionados num arquivo SQLite (uma conexão por operação, segura entre threads)."""
+
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = str(caminho)
+        with closing(self._conectar()) as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_ESQUEMA)
+
+    def _conectar(self):
+        return sqlite3.connect(self.caminho, timeout=30)
+
+    def salvar(self, nome, params, meses=12, curvas=None, df_raw=None, nota=''):
+        """Grava uma nova versão de `nome` e retorna o número dela.
+
+        `df_raw` evita recalcular a projeção quando ela já está em mãos (ex.: cache do app).
+        """
+        nome = str(nome).strip()
+        if not nome:
+            raise ValueError("O cenário precisa de um nome.")
+        if df_raw is None:
+            df_raw = dre_dataframe(params, meses, curvas)
+        valores = np.ascontiguousarray(df_raw[ORDEM].to_numpy(dtype=np.float64))
+        with closing(self._conectar()) as con, con:
+            # BEGIN IMMEDIATE: duas sessões salvando o mesmo nome não disputam a versão
+            con.execute("BEGIN IMMEDIATE")
+            versao = con.execute("SELECT COALESCE(MAX(versao), 0) + 1 FROM cenarios WHERE nome = ?", (nome,)).fetchone()[0]
+            con.execute(
+                "INSERT INTO cenarios (nome, versao, criado_em, meses, params, curvas, linhas, projecao, nota)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (nome, versao, time.time(), len(valores), json.dumps(params._asdict()),
+                 None if curvas is None else json.dumps(curvas._asdict()), json.dumps(ORDEM),
+                 valores.tobytes(), nota),
+            )
+        return versao
+
+    def listar(self, nome=None, limite=None):
+        """Metadados das versões (mais recentes primeiro), sem ler as projeções."""
+        sql = f"SELECT {_META} FROM cenarios"
+        args = []
+        if nome is not None:
+            sql += " WHERE nome = ?"
+            args.append(nome)
+        sql += " ORDER BY criado_em DESC, id DESC"
+        if limite is not None:
+            sql += " LIMIT ?"
+            args.append(int(limite))
+        with closing(self._conectar()) as con:
+            df = pd.read_sql_query(sql, con, params=args)
+        df['criado_em'] = pd.to_datetime(df['criado_em'], unit='s')
+        return df
+
+    def nomes(self):
+        """Nomes distintos, em ordem alfabética."""
+        with closing(self._conectar()) as con:
+            return [n for (n,) in con.execute("SELECT DISTINCT nome FROM cenarios ORDER BY nome")]
+
+    def carregar(self, nome, versao=None):
+        """Cenário salvo (última versão se `versao` for None), com a projeção gravada."""
+        sql = "SELECT versao, criado_em, params, curvas, linhas, projecao, nota FROM cenarios WHERE nome = ?"
+        with closing(self._conectar()) as con:
+            if versao is None:
+                linha = con.execute(sql + " ORDER BY versao DESC LIMIT 1", (nome,)).fetchone()
+            else:
+                linha = con.execute(sql + " AND versao = ?", (nome, int(versao))).fetchone()
+        if linha is None:
+            raise KeyError(f"Cenário não encontrado: {nome}" + ("" if versao is None else f" v{versao}"))
+        versao, criado_em, params, curvas, linhas, projecao, nota = linha
+        linhas = json.loads(linhas)
+        valores = np.frombuffer(projecao, dtype=np.float64).reshape(-1, len(linhas))
+        df_raw = pd.DataFrame(valores, columns=linhas)
+        df_raw.insert(0, 'Mês', rotulos_meses(len(df_raw)))
+        # Parâmetros criados depois do salvamento assumem o padrão
+        return Cenario(nome, versao, pd.to_datetime(criado_em, unit='s'), Parametros(**json.loads(params)),
+                       None if curvas is None else Curvas(**json.loads(curvas)), df_raw, nota)
+
+    def remover(self, nome, versao=None):
+        """Apaga uma versão ou, sem `versao`, todas as do cenário; retorna quantas."""
+        with closing(self._conectar()) as con, con:
+            if versao is None:
+                return con.execute("DELETE FROM cenarios WHERE nome = ?", (nome,)).rowcount
+            return con.execute("DELETE FROM cenarios WHERE nome = ? AND versao = ?", (nome, int(versao))).rowcount
+
+
+def comparar(df_a, df_b):
+    """Diferença célula a célula entre duas DREs (índice: linhas; colunas: períodos).
+
+    Só as linhas e os períodos presentes nas duas entram, na ordem de `df_a`.
+    """
+    linhas = df_a.index.intersection(df_b.index, sort=False)
+    periodos = df_a.columns.intersection(df_b.columns, sort=False)
+    a = df_a.loc[linhas, periodos]
+    b = df_b.loc[linhas, periodos]
+    va, vb = a.to_numpy(dtype=float), b.to_numpy(dtype=float)
+    delta = vb - va
+    base = np.abs(va)
+    pct = np.divide(delta, base, out=np.full_like(delta, np.nan), where=base > 0)
+    return Diferenca(a, b, pd.DataFrame(delta, index=linhas, columns=periodos),
+                     pd.DataFrame(pct, index=linhas, columns=periodos))
+
+
+def lado_a_lado(dif, rotulos=('A', 'B')):
+    """Tabela única com colunas (período, A | B | Δ | Δ%) para exibição ou exportação."""
+    partes = {rotulos[0]: dif.a, rotulos[1]: dif.b, 'Δ': dif.absoluta, 'Δ%': dif.percentual}
+    df = pd.concat(partes, axis=1).swaplevel(axis=1)
+    return df.reindex(columns=pd.MultiIndex.from_product([dif.a.columns, list(partes)]))
@@ -0,0 +1,124 @@
+"""Motor de receita por coortes (mês de aquisição x idade).
+
+Cada coorte perde clientes e expande receita segundo curvas que variam com a
+idade do cliente, em vez das taxas planas de `churn` e `upsell`. Os novos
+clientes de cada mês continuam sendo `trunc(ativos * cresc)`; a sobrevivência
+é esperada (fracionária), por isso as contagens podem diferir levemente do
+motor agregado.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from modelo import _razao, _resultado, rotulos_meses
+
+
+class Curvas(NamedTuple):
+    """Curvas paramétricas por idade: valor(a) = final + (inicial - final) * 0.5 ** (a / meia_vida)."""
+    churn_inicial: float = 0.06
+    churn_final: float = 0.02
+    meia_vida_churn: float = 6.0
+    expansao_inicial: float = 0.0     # receita extra (% do ticket) de um cliente novo
+    expansao_final: float = 0.15      # ... e de um cliente maduro
+    meia_vida_expansao: float = 12.0
+    idade_base: int = 12              # idade assumida para a base de clientes inicial
+
+    def por_idade(self, n):
+        """Arrays (churn, expansão) para as idades 0..n-1."""
+        return (_curva(self.churn_inicial, self.churn_final, self.meia_vida_churn, n),
+                _curva(self.expansao_inicial, self.expansao_final, self.meia_vida_expansao, n))
+
+
+class ResultadoCoortes(NamedTuple):
+    linhas: dict              # linhas da DRE, como em `projetar`
+    clientes: np.ndarray      # (coortes x meses+1): coorte 0 é a base inicial; coluna 0 é o início
+    receita: np.ndarray       # idem, receita bruta
+    vida: float               # meses de ticket gerados por um cliente novo (com expansão)
+
+
+def _curva(inicial, final, meia_vida, n):
+    idades = np.arange(n)
+    if meia_vida <= 0:
+        return np.full(n, float(final))
+    return final + (inicial - final) * 0.5 ** (idades / meia_vida)
+
+
+def _estender(curva, n):
+    curva = np.asarray(curva, dtype=float)
+    return np.pad(curva, (0, max(0, n - len(curva))), mode='edge')[:n]
+
+
+def projetar_coortes(params, churn_idade, expansao_idade, meses=12, idade_base=0):
+    """Projeta a DRE a partir da matriz de coortes.
+
+    `churn_idade[a]` é a taxa de perda aplicada quando a coorte passa da idade
+    a para a+1 e `expansao_idade[a]` a receita extra (% do ticket) por cliente
+    na idade a; curvas curtas são estendidas com o último valor.
+    """
+    n_idades = meses + idade_base + 1
+    churn = _estender(churn_idade, n_idades)
+    fator = 1 + _estender(expansao_idade, n_idades)
+    sobrev = np.concatenate([[1.0], np.cumprod(1 - churn[:-1])])
+
+    # Base inicial envelhece a partir de `idade_base`
+    base = params.cli_ini * sobrev[idade_base:idade_base + meses + 1] / sobrev[idade_base]
+
+    # Novos dependem do total ativo: recorrência curta em cima de produtos escalares
+    novos = np.zeros(meses + 1)
+    ativos = np.empty(meses + 1)
+    ativos[0] = params.cli_ini
+    for m in range(1, meses + 1):
+        novos[m] = np.trunc(ativos[m - 1] * params.cresc)
+        ativos[m] = base[m] + novos[1:m + 1] @ sobrev[m - 1::-1]
+
+    # Matriz triangular coorte x mês
+    coorte = np.arange(meses + 1)[:, None]
+    idade = np.arange(meses + 1)[None, :] - coorte
+    valida = idade >= 0
+    idade = np.clip(idade, 0, None)
+    clientes = np.where(valida, novos[:, None] * sobrev[idade], 0.0)
+    clientes[0] = base
+    idade[0] += idade_base
+    receita = clientes * params.ticket * fator[idade]
+
+    fim = clientes[:, 1:].sum(axis=0)
+    entradas = novos[1:]
+    perda = ativos[:-1] + entradas - fim
+    mrr = fim * params.ticket
+    rec_bruta = receita[:, 1:].sum(axis=0)
+    # NRR: receita do mês das coortes que já existiam no mês anterior / receita total do mês anterior
+    retida = np.where(coorte < np.arange(meses + 1)[None, :], receita, 0.0).sum(axis=0)[1:]
+    nrr = _razao(retida, receita.sum(axis=0)[:-1])
+
+    # Vida esperada de um cliente novo: soma da receita relativa sobrevivente + cauda geométrica
+    # (churn final zero deixa a vida indefinida; como no motor agregado, o LTV fica 0)
+    c_fim = churn[-1]
+    cauda = sobrev[-1] * fator[-1] * (1 - c_fim) / c_fim if c_fim > 0 else np.inf
+    vida = float(sobrev @ fator + cauda) if np.isfinite(cauda) else 0.0
+
+    p = {k: np.asarray(x, dtype=float)[..., None] for k, x in params._asdict().items()}
+    linhas = _resultado(p, (meses,), fim, entradas, perda, mrr, rec_bruta, vida=vida, nrr=nrr)
+    return ResultadoCoortes(linhas, clientes, receita, vida)
+
+
+def projetar_curvas(params, curvas, meses=12):
+    churn, expansao = curvas.por_idade(meses + curvas.idade_base + 1)
+    return projetar_coortes(params, churn, expansao, meses, curvas.idade_base)
+
+
+def receita_por_idade(res, relativa=True):
+    """Receita das coortes adquiridas, alinhada por idade (índice: coorte; colunas: idade).
+
+    Com `relativa`, cada coorte é dividida pela receita do seu primeiro mês;
+    coortes sem receita inicial (nenhum cliente novo) ficam NaN, não 0%.
+    """
+    n = res.receita.shape[1]
+    k = np.arange(1, n)[:, None]          # sem a base inicial
+    col = k + np.arange(n - 1)[None, :]
+    valores = np.where(col < n, res.receita[k, np.clip(col, 0, n - 1)], np.nan)
+    if relativa:
+        base = np.broadcast_to(res.receita[k, k], valores.shape)
+        valores = np.divide(valores, base, out=np.full_like(valores, np.nan), where=base > 0)
+    return pd.DataFrame(valores, index=pd.Index(rotulos_meses(n - 1), name='Coorte'),
+                        columns=pd.Index(range(n - 1), name='Idade (meses)'))
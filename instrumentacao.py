@@ -0,0 +1,121 @@
+"""Instrumentação opcional por rerun: tempo e alocação de cada etapa do script.
+
+Desligada por padrão: `etapa()` devolve um context manager nulo compartilhado,
+então o custo no app é uma chamada de método por etapa. Liga com a variável
+de ambiente VAIONTEC_PERFIL=1 (ou `?perfil=1` na URL do app, só tempos); com
+VAIONTEC_PERFIL_LOG=<arquivo>, cada rerun vira uma linha JSON no arquivo.
+
+As alocações vêm do tracemalloc, que é global ao processo: fica ligado
+enquanto houver algum rerun medindo memória (contagem de referências) e, com
+várias sessões ativas ao mesmo tempo, os números de memória se misturam (os
+tempos não).
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+ATIVO_ENV = 'VAIONTEC_PERFIL'
+LOG_ENV = 'VAIONTEC_PERFIL_LOG'
+HISTORICO = 200  # reruns mantidos por sessão
+
+_NULO = nullcontext()
+_trava_log = threading.Lock()
+_trava_trace = threading.Lock()
+_usuarios_trace = 0     # Perfis medindo memória agora
+_trace_proprio = False  # tracemalloc ligado por nós (se já estava ligado, não desligamos)
+
+
+def ativo_por_ambiente():
+    return os.environ.get(ATIVO_ENV, '').lower() in ('1', 'true', 'sim')
+
+
+class Perfil:
+    """Medições de um rerun. Use `with perfil.etapa('nome'):` em volta de cada etapa."""
+
+    def __init__(self, ativo=False, memoria=True, log=None):
+        self.ativo = ativo
+        self.memoria = ativo and memoria
+        self.etapas = []
+        if not ativo:
+            return
+        self.log = log if log is not None else os.environ.get(LOG_ENV)
+        self._nivel = 0
+        if self.memoria:
+            _reter_trace()
+            # Um rerun interrompido (st.rerun, exceção) não chega a `finalizar`: a
+            # referência é devolvida quando o Perfil é coletado
+            self._liberar = weakref.finalize(self, _liberar_trace)
+        self._inicio = time.perf_counter()
+        self._mem0 = tracemalloc.get_traced_memory()[0] if self.memoria else 0
+
+    def etapa(self, nome):
+        if not self.ativo:
+            return _NULO
+        return self._medir(nome)
+
+    @contextmanager
+    def _medir(self, nome):
+        # registrada na entrada: a lista fica na ordem de início, externas antes das aninhadas
+        registro = {'etapa': nome, 'nivel': self._nivel, 'ms': 0.0, 'alocado_kb': 0.0 if self.memoria else None}
+        self.etapas.append(registro)
+        self._nivel += 1
+        mem0 = tracemalloc.get_traced_memory()[0] if self.memoria else 0
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            registro['ms'] = 1000 * (time.perf_counter() - t0)
+            if self.memoria:
+                registro['alocado_kb'] = (tracemalloc.get_traced_memory()[0] - mem0) / 1024
+            self._nivel = registro['nivel']
+
+    def finalizar(self, historico=None, **contexto):
+        """Fecha o rerun: registro com total, pico de memória e etapas (na ordem em que começaram).
+
+        O registro vai para `historico` (um deque) e, se configurado, para o log JSON lines.
+        Sem medição de memória, `pico_kb` e `alocado_kb` ficam None.
+        """
+        if not self.ativo:
+            return None
+        total = 1000 * (time.perf_counter() - self._inicio)
+        pico = None
+        if self.memoria:
+            pico = (tracemalloc.get_traced_memory()[1] - self._mem0) / 1024
+            self._liberar()
+        registro = {'ts': time.time(), **contexto, 'total_ms': total, 'pico_kb': pico, 'etapas': self.etapas}
+        if historico is not None:
+            historico.append(registro)
+        if self.log:
+            with _trava_log, open(self.log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+        self.ativo = False
+        return registro
+
+
+def _reter_trace():
+    global _usuarios_trace, _trace_proprio
+    with _trava_trace:
+        if _usuarios_trace == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _trace_proprio = True
+        elif tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        _usuarios_trace += 1
+
+
+def _liberar_trace():
+    global _usuarios_trace, _trace_proprio
+    with _trava_trace:
+        _usuarios_trace -= 1
+        if _usuarios_trace == 0 and _trace_proprio:
+            tracemalloc.stop()
+            _trace_proprio = False
+
+
+def novo_historico():
+    return deque(maxlen=HISTORICO)
@@ -0,0 +1,108 @@
+"""Avaliação em lote de cenários com a mesma matemática de `calcular_dre`.
+
+Um lote é uma matriz N x P com uma linha por cenário e uma coluna por chave de
+`defaults` (na ordem de `CHAVES`). O resultado é um tensor N x meses x K com
+todas as linhas da DRE (K = len(ORDEM)).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from modelo import ORDEM, Parametros, _linhas, rotulos_meses
+
+CHAVES = Parametros._fields
+BLOCO_PADRAO = 20_000  # cenários por bloco num horizonte de 12 meses: limita a memória dos intermediários
+
+
+def bloco_para(meses, bloco=BLOCO_PADRAO):
+    """Cenários por bloco para o horizonte: mantém cenários x meses de `bloco` x 12."""
+    return max(1, bloco * 12 // max(1, meses))
+
+
+def montar_grade(base=Parametros(), **eixos):
+    """Produto cartesiano dos valores em `eixos`; as demais chaves ficam em `base`.
+
+    Ex.: montar_grade(cresc=[0.05, 0.1], churn=np.linspace(0.01, 0.05, 5))
+    """
+    desconhecidas = set(eixos) - set(CHAVES)
+    if desconhecidas:
+        raise KeyError(f"Parâmetros desconhecidos: {sorted(desconhecidas)}")
+    malhas = np.meshgrid(*(np.asarray(v, dtype=float) for v in eixos.values()), indexing='ij')
+    matriz = np.tile(np.asarray(base, dtype=float), (malhas[0].size if malhas else 1, 1))
+    for k, malha in zip(eixos, malhas):
+        matriz[:, CHAVES.index(k)] = malha.ravel()
+    return matriz
+
+
+def _como_matriz(cenarios):
+    if isinstance(cenarios, pd.DataFrame):
+        desconhecidas = set(cenarios.columns) - set(CHAVES)
+        if desconhecidas:
+            raise KeyError(f"Parâmetros desconhecidos: {sorted(desconhecidas)}")
+        base = pd.DataFrame([Parametros()] * len(cenarios), columns=CHAVES, index=cenarios.index)
+        cenarios = cenarios.reindex(columns=CHAVES).fillna(base)
+    matriz = np.asarray(cenarios, dtype=float)
+    if matriz.ndim != 2 or matriz.shape[1] != len(CHAVES):
+        raise ValueError(f"Esperada matriz N x {len(CHAVES)} (colunas: {', '.join(CHAVES)})")
+    return matriz
+
+
+def _avaliar_bloco(matriz, meses, out=None):
+    res = _linhas(dict(zip(CHAVES, matriz.T)), meses)
+    if out is None:
+        out = np.empty((len(matriz), meses, len(ORDEM)))
+    for k, nome in enumerate(ORDEM):
+        out[..., k] = res[nome]
+    return out
+
+
+def _avaliar_compartilhado(nome, forma, inicio, matriz, meses):
+    # Escreve direto no tensor do processo pai: nada volta pelo pickle
+    shm = SharedMemory(name=nome)
+    try:
+        tensor = np.ndarray(forma, dtype=np.float64, buffer=shm.buf)
+        _avaliar_bloco(matriz, meses, tensor[inicio:inicio + len(matriz)])
+        del tensor
+    finally:
+        shm.close()
+
+
+def avaliar_lote(cenarios, meses=12, processos=None, bloco=None):
+    """Projeta N cenários de uma vez; retorna um tensor N x meses x K.
+
+    `cenarios` é uma matriz N x P (colunas em `CHAVES`) ou um DataFrame com
+    colunas nomeadas pelas chaves (as ausentes assumem o valor padrão).
+    Com `processos` > 1 os blocos são distribuídos num pool de processos, que
+    escrevem o resultado numa memória compartilhada; só compensa com núcleos
+    livres e lotes grandes (centenas de milhares de cenários). Sem `bloco`, o
+    tamanho do bloco acompanha o horizonte (`bloco_para`).
+    """
+    matriz = _como_matriz(cenarios)
+    bloco = bloco or bloco_para(meses)
+    forma = (len(matriz), meses, len(ORDEM))
+    inicios = range(0, len(matriz), bloco)
+    if not (processos and processos > 1 and len(inicios) > 1):
+        tensor = np.empty(forma)
+        for i in inicios:
+            _avaliar_bloco(matriz[i:i + bloco], meses, tensor[i:i + bloco])
+        return tensor
+
+    shm = SharedMemory(create=True, size=max(1, int(np.prod(forma)) * 8))
+    try:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            list(pool.map(_avaliar_compartilhado, [shm.name] * len(inicios), [forma] * len(inicios), inicios,
+                          [matriz[i:i + bloco] for i in inicios], [meses] * len(inicios)))
+        tensor = np.ndarray(forma, dtype=np.float64, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return tensor
+
+
+def lote_para_df(tensor):
+    """Formato longo: uma linha por (cenário, mês) e uma coluna por linha da DRE."""
+    n, meses, _ = tensor.shape
+    indice = pd.MultiIndex.from_product([range(n), rotulos_meses(meses)], names=['Cenário', 'Mês'])
+    return pd.DataFrame(tensor.reshape(n * meses, -1), index=indice, columns=ORDEM)
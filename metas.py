@@ -0,0 +1,113 @@
+"""Goal seek: encontra o valor de um input que faz uma linha da DRE atingir uma meta.
+
+O truncamento de novos/perda deixa a DRE em degraus, então não há raiz
+contínua garantida: o solver procura a fronteira em que a condição da meta
+passa a ser satisfeita. Cada iteração avalia uma grade de candidatos de todas
+as metas ativas num único lote e encolhe o intervalo para a célula onde a
+condição muda.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from lote import CHAVES, avaliar_lote
+from modelo import ORDEM
+
+
+class Meta(NamedTuple):
+    chave: str              # input de `defaults` a ajustar
+    linha: str              # linha da DRE
+    mes: int                # mês avaliado (1 = primeiro)
+    alvo: float
+    sentido: str = '>='     # '>=' ou '<='
+    limites: tuple = None   # intervalo de busca (min, max); padrão: [0, 10 x base]
+
+
+class ResultadoMeta(NamedTuple):
+    meta: Meta
+    valor: float            # NaN quando a meta não muda de lado dentro dos limites
+    kpi: float              # valor da linha no mês com o input em `valor`
+    iteracoes: int
+
+
+def _limites(base, meta):
+    if meta.limites is not None:
+        return map(float, meta.limites)
+    atual = float(getattr(base, meta.chave))
+    return 0.0, (10 * atual if atual > 0 else 1.0)
+
+
+def _validar(meta):
+    if meta.chave not in CHAVES:
+        raise KeyError(f"Input desconhecido: {meta.chave}")
+    if meta.linha not in ORDEM:
+        raise KeyError(f"Linha da DRE desconhecida: {meta.linha}")
+    if meta.sentido not in ('>=', '<='):
+        raise ValueError(f"Sentido inválido: {meta.sentido}")
+    if meta.mes < 1:
+        raise ValueError("O mês da meta começa em 1.")
+
+
+def _avaliar(base, metas, candidatos, meses):
+    """KPI de cada meta para cada candidato: array len(metas) x pontos, num só lote."""
+    n, pontos = candidatos.shape
+    matriz = np.tile(np.asarray(base, dtype=float), (n * pontos, 1))
+    colunas = np.repeat([CHAVES.index(m.chave) for m in metas], pontos)
+    matriz[np.arange(n * pontos), colunas] = candidatos.ravel()
+    tensor = avaliar_lote(matriz, meses).reshape(n, pontos, meses, len(ORDEM))
+    mes = np.array([m.mes - 1 for m in metas])[:, None]
+    linha = np.array([ORDEM.index(m.linha) for m in metas])[:, None]
+    return tensor[np.arange(n)[:, None], np.arange(pontos)[None, :], mes, linha]
+
+
+def _satisfaz(metas, kpis):
+    alvo = np.array([m.alvo for m in metas])[:, None]
+    maior = np.array([m.sentido == '>=' for m in metas])[:, None]
+    return np.where(maior, kpis >= alvo, kpis <= alvo)
+
+
+def resolver(base, metas, pontos=33, tol=1e-6, max_iter=20):
+    """Resolve várias metas de uma vez a partir dos parâmetros `base`.
+
+    Para cada meta, localiza (com precisão relativa `tol`) a primeira fronteira,
+    a partir do limite inferior, em que a condição muda, e retorna o lado dela
+    que satisfaz a meta, na ordem de `metas`.
+    """
+    metas = list(metas)
+    if not metas:
+        return []
+    for m in metas:
+        _validar(m)
+    meses = max(m.mes for m in metas)
+    intervalos = np.array([list(_limites(base, m)) for m in metas], dtype=float).reshape(-1, 2)
+
+    # Precisa haver mudança de lado da condição entre os dois limites
+    sat = _satisfaz(metas, _avaliar(base, metas, intervalos, meses))
+    ativas = sat[:, 0] != sat[:, 1]
+    iteracoes = np.zeros(len(metas), dtype=int)
+    sat_lo = sat[:, 0].copy()
+
+    for i in range(1, max_iter + 1):
+        largura = intervalos[:, 1] - intervalos[:, 0]
+        ativas &= largura > tol * np.maximum(1.0, np.abs(intervalos).max(axis=1))
+        if not ativas.any():
+            break
+        idx = np.flatnonzero(ativas)
+        sub = [metas[j] for j in idx]
+        grade = np.linspace(intervalos[idx, 0], intervalos[idx, 1], pontos, axis=1)
+        s = _satisfaz(sub, _avaliar(base, sub, grade, meses))
+        # Primeiro candidato cuja condição difere da do limite inferior
+        troca = np.argmax(s != sat_lo[idx][:, None], axis=1)
+        intervalos[idx, 0] = grade[np.arange(len(idx)), troca - 1]
+        intervalos[idx, 1] = grade[np.arange(len(idx)), troca]
+        iteracoes[idx] = i
+
+    # O valor retornado é o extremo do intervalo que satisfaz a meta
+    bracket = sat[:, 0] != sat[:, 1]
+    valores = np.where(sat_lo, intervalos[:, 0], intervalos[:, 1])
+    valores[~bracket] = np.nan
+    kpis = np.full(len(metas), np.nan)
+    if bracket.any():
+        idx = np.flatnonzero(bracket)
+        kpis[idx] = _avaliar(base, [metas[j] for j in idx], valores[idx][:, None], meses)[:, 0]
+    return [ResultadoMeta(m, v, k, it) for m, v, k, it in zip(metas, valores, kpis, iteracoes)]
@@ -0,0 +1,232 @@
+"""Motor de projeção da DRE, independente do Streamlit.
+
+Recebe um conjunto de parâmetros simples e devolve as linhas da DRE como
+arrays NumPy no eixo dos meses, para uso tanto pelo app quanto por jobs em lote.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+
+# --- 1. PARÂMETROS ---
+class Parametros(NamedTuple):
+    # 1. Receita Drivers
+    cli_ini: float = 50
+    cresc: float = 0.10
+    churn: float = 0.03
+    ticket: float = 500.0
+    upsell: float = 0.05
+    # 2. Variáveis
+    cogs: float = 30.0
+    comissao: float = 0.05
+    imposto: float = 0.06
+    taxa: float = 0.02
+    # 3. Fixos
+    mkt: float = 5000.0
+    outros: float = 3000.0
+    # 4. Folha
+    s_socio: float = 8000.0
+    q_socio: int = 2
+    s_dev: float = 5000.0
+    q_dev: int = 2
+    s_cs: float = 2500.0
+    q_cs: int = 1
+    s_venda: float = 3000.0
+    q_venda: int = 1
+    encargos: float = 0.35
+    # 5. Contábil
+    deprec: float = 400.0
+    amort: float = 600.0
+    fin: float = 0.0
+    irpj: float = 0.0
+
+    @classmethod
+    def de_estado(cls, estado):
+        """Monta os parâmetros a partir de qualquer mapeamento (ex.: st.session_state)."""
+        return cls(**{k: estado[k] for k in cls._fields})
+
+
+defaults = Parametros()._asdict()
+
+key_map = {
+    'cli_ini': 'Clientes Iniciais', 'cresc': 'Tx Crescimento Mensal', 'churn': 'Tx Churn Mensal',
+    'ticket': 'Ticket Médio (R$)', 'upsell': 'Tx Upsell (% Rec)',
+    'cogs': 'COGS Unitário (R$)', 'comissao': 'Tx Comissão (%)', 'imposto': 'Tx Imposto Simples (%)', 'taxa': 'Tx Meios Pagto (%)',
+    'mkt': 'Budget Marketing (R$)', 'outros': 'Outras Desp. Fixas (R$)',
+    's_socio': 'Salário Sócio', 'q_socio': 'Qtd Sócio',
+    's_dev': 'Salário Dev', 'q_dev': 'Qtd Dev',
+    's_cs': 'Salário Suporte', 'q_cs': 'Qtd Suporte',
+    's_venda': 'Salário Vendas', 'q_venda': 'Qtd Vendas',
+    'encargos': 'Tx Encargos Folha (%)',
+    'deprec': 'Depreciação (R$)', 'amort': 'Amortização (R$)', 'fin': 'Resultado Fin. (R$)', 'irpj': 'Tx IRPJ Extra (%)'
+}
+
+# Linhas da DRE, na ordem de exibição
+ORDEM = [
+    "1. Clientes Ativos", "1.1 Novos", "1.2 Churn (Qtd)", "1.3 Ticket Médio",
+    "2. MRR (Recorrente)", "2.1 Receita Bruta",
+    "(-) Impostos", "3. Receita Líquida",
+    "(-) COGS (Entrega)", "(-) Comissões/Taxas",
+    "4. Margem Contribuição",
+    "(-) Folha + Encargos", "(-) Mkt + Fixos",
+    "5. EBITDA",
+    "(-) Deprec/Amort", "(+/-) Res. Financeiro",
+    "6. Lucro Líquido",
+    "7. Ponto Equilíbrio (R$)", "Fator R (%)",
+    "CAC (R$)", "LTV (R$)", "Payback (Meses)", "NRR (Estimado)"
+]
+
+
+# --- 2. FUNÇÕES ---
+def rotulos_meses(meses=12):
+    return [f"Mês {i}" for i in range(1, meses + 1)]
+
+
+def _razao(num, den):
+    """Divisão protegida: retorna 0 onde o denominador não é positivo."""
+    num, den = np.broadcast_arrays(np.asarray(num, dtype=float), np.asarray(den, dtype=float))
+    return np.divide(num, den, out=np.zeros(num.shape), where=den > 0)
+
+
+def _linhas(v, meses=12, mensais=None):
+    """Núcleo vetorizado da DRE.
+
+    Cada valor de `v` pode ser escalar ou array de forma S (ex.: um lote de
+    cenários); o resultado tem forma S + (meses,) para cada linha da DRE.
+    `mensais` sobrepõe chaves com valores que variam mês a mês (forma S + (meses,)).
+    """
+    mensais = mensais or {}
+    formas = [np.shape(x) for x in v.values()] + [np.shape(x)[:-1] for x in mensais.values()]
+    forma = np.broadcast_shapes(*formas) + (meses,)
+    # Eixo do mês no final: escalar -> (1,), lote (N,) -> (N, 1)
+    p = {k: np.asarray(x, dtype=float)[..., None] for k, x in v.items()}
+    p.update({k: np.asarray(x, dtype=float) for k, x in mensais.items()})
+
+    # Lógica de Growth: o truncamento de novos/perda torna a base uma recorrência
+    novos, perda, fim = np.empty(forma), np.empty(forma), np.empty(forma)
+    cli = np.broadcast_to(p['cli_ini'][..., 0], forma[:-1])
+    cresc, churn = np.broadcast_to(p['cresc'], forma), np.broadcast_to(p['churn'], forma)
+    for m in range(meses):
+        novos[..., m] = np.trunc(cli * cresc[..., m])
+        perda[..., m] = np.trunc(cli * churn[..., m])
+        cli = cli + novos[..., m] - perda[..., m]
+        fim[..., m] = cli
+
+    # Receita
+    mrr = fim * p['ticket']
+    rec_bruta = mrr * (1 + p['upsell'])
+    return _resultado(p, forma, fim, novos, perda, mrr, rec_bruta)
+
+
+def _resultado(p, forma, fim, novos, perda, mrr, rec_bruta, vida=None, nrr=None):
+    """Linhas da DRE a partir da base de clientes e da receita.
+
+    `vida` (meses de ticket que um cliente gera, já com expansão) e `nrr`
+    substituem as estimativas de churn plano quando o motor de coortes é usado.
+    """
+    # Variáveis
+    imp_val = rec_bruta * p['imposto']
+    rec_liq = rec_bruta - imp_val
+    cogs_val = fim * p['cogs']
+    comissao_val = rec_bruta * p['comissao']
+    taxa_val = rec_bruta * p['taxa']
+    margem = rec_liq - (cogs_val + comissao_val + taxa_val)
+
+    # Fixos
+    folha_base = (p['s_socio'] * p['q_socio']) + (p['s_dev'] * p['q_dev']) + (p['s_cs'] * p['q_cs']) + (p['s_venda'] * p['q_venda'])
+    folha_tot = folha_base * (1 + p['encargos'])
+    fixos_op = folha_tot + p['mkt'] + p['outros']
+
+    # Resultados
+    ebitda = margem - fixos_op
+    deprec_amort = p['deprec'] + p['amort']
+    lair = ebitda - deprec_amort + p['fin']
+    lucro = np.where(lair > 0, lair * (1 - p['irpj']), lair)
+
+    # KPIs (Protegidos contra div/0)
+    mc_pct = _razao(margem, rec_liq)
+    mb_pct = _razao(margem, rec_bruta)
+    pe_val = _razao(fixos_op + deprec_amort - p['fin'], mb_pct)
+    fator_r = _razao(folha_tot, rec_bruta)
+    cac = _razao(p['mkt'] + comissao_val, novos)
+    ltv_num = p['ticket'] * mc_pct
+    ltv = _razao(ltv_num, p['churn']) if vida is None else ltv_num * vida
+    payback = _razao(cac, ltv_num)
+    if nrr is None:
+        nrr = 1 + p['upsell'] - p['churn']
+
+    linhas = [
+        fim, novos, perda, p['ticket'],
+        mrr, rec_bruta,
+        imp_val, rec_liq,
+        cogs_val, comissao_val + taxa_val,
+        margem,
+        folha_tot, p['mkt'] + p['outros'],
+        ebitda,
+        deprec_amort, p['fin'],
+        lucro,
+        pe_val, fator_r,
+        cac, ltv, payback, nrr,
+    ]
+    return {nome: np.array(np.broadcast_to(arr, forma)) for nome, arr in zip(ORDEM, linhas)}
+
+
+def projetar(params, meses=12):
+    """Projeta a DRE de um cenário: {linha da DRE: array com um valor por mês}."""
+    return _linhas(params._asdict(), meses)
+
+
+# --- 3. AGREGAÇÃO POR PERÍODO ---
+PERIODOS = {'Mensal': 1, 'Trimestral': 3, 'Anual': 12}
+_PREFIXOS = {'Mensal': 'Mês', 'Trimestral': 'Tri', 'Anual': 'Ano'}
+
+# Fluxos são somados no período; estoques e preços são tomados no fim do período
+FLUXOS = [
+    "1.1 Novos", "1.2 Churn (Qtd)", "2.1 Receita Bruta", "(-) Impostos", "3. Receita Líquida",
+    "(-) COGS (Entrega)", "(-) Comissões/Taxas", "4. Margem Contribuição",
+    "(-) Folha + Encargos", "(-) Mkt + Fixos", "5. EBITDA",
+    "(-) Deprec/Amort", "(+/-) Res. Financeiro", "6. Lucro Líquido",
+]
+ESTOQUES = ["1. Clientes Ativos", "1.3 Ticket Médio", "2. MRR (Recorrente)"]
+
+
+def rotulos_periodos(meses, periodo='Mensal'):
+    n = -(-meses // PERIODOS[periodo])
+    return [f"{_PREFIXOS[periodo]} {i}" for i in range(1, n + 1)]
+
+
+def agregar(linhas, periodo='Mensal'):
+    """Agrupa a projeção mensal em trimestres ou anos.
+
+    Fluxos são somados, estoques vêm do último mês do período e os indicadores
+    (PE, Fator R, CAC, LTV, Payback, NRR) são recalculados sobre os agregados.
+    Um período final incompleto agrega apenas os meses disponíveis.
+    """
+    k = PERIODOS[periodo]
+    if k == 1:
+        return linhas
+    meses = np.shape(linhas[ORDEM[0]])[-1]
+    inicios = np.arange(0, meses, k)
+    fins = np.minimum(inicios + k, meses) - 1
+
+    out = {nome: np.add.reduceat(linhas[nome], inicios, axis=-1) for nome in FLUXOS}
+    out.update({nome: linhas[nome][..., fins] for nome in ESTOQUES})
+
+    mc_pct = _razao(out["4. Margem Contribuição"], out["3. Receita Líquida"])
+    mb_pct = _razao(out["4. Margem Contribuição"], out["2.1 Receita Bruta"])
+    fixos = out["(-) Folha + Encargos"] + out["(-) Mkt + Fixos"] + out["(-) Deprec/Amort"] - out["(+/-) Res. Financeiro"]
+    out["7. Ponto Equilíbrio (R$)"] = _razao(fixos, mb_pct)
+    out["Fator R (%)"] = _razao(out["(-) Folha + Encargos"], out["2.1 Receita Bruta"])
+    # CAC do período = gasto de aquisição / novos (o CAC mensal já é gasto / novos)
+    out["CAC (R$)"] = _razao(np.add.reduceat(linhas["CAC (R$)"] * linhas["1.1 Novos"], inicios, axis=-1), out["1.1 Novos"])
+    ltv_num = out["1.3 Ticket Médio"] * mc_pct
+    # Vida esperada (LTV / margem por cliente) do fim do período, aplicada à margem do período
+    ltv_num_mes = linhas["1.3 Ticket Médio"] * _razao(linhas["4. Margem Contribuição"], linhas["3. Receita Líquida"])
+    # Divide onde a margem não é zero: com margem negativa o LTV do período também fica negativo
+    vida = np.divide(linhas["LTV (R$)"], ltv_num_mes, out=np.zeros(np.shape(ltv_num_mes)),
+                     where=ltv_num_mes != 0)[..., fins]
+    out["LTV (R$)"] = ltv_num * vida
+    out["Payback (Meses)"] = _razao(out["CAC (R$)"], ltv_num)
+    # Retenção encadeia mês a mês
+    out["NRR (Estimado)"] = np.multiply.reduceat(linhas["NRR (Estimado)"], inicios, axis=-1)
+    return {nome: out[nome] for nome in ORDEM}
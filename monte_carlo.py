@@ -0,0 +1,86 @@
+"""Modo de risco: simulação de Monte Carlo sobre o motor da DRE.
+
+`cresc`, `churn`, `ticket` e `upsell` recebem distribuições no formato
+("normal", media, desvio), ("triangular", minimo, moda, maximo) ou
+("uniforme", minimo, maximo). Cada caminho é uma projeção completa; as
+amostras podem ser sorteadas uma vez por caminho ou a cada mês.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from lote import bloco_para
+from modelo import _linhas, rotulos_meses
+
+VARIAVEIS = ('cresc', 'churn', 'ticket', 'upsell')
+LINHAS_BANDAS = ('2.1 Receita Bruta', '5. EBITDA', '6. Lucro Líquido')
+PERCENTIS = {'P10': 10, 'P50': 50, 'P90': 90}
+
+
+class ResultadoMC(NamedTuple):
+    bandas: pd.DataFrame           # índice: Mês; colunas: (linha, P10/P50/P90)
+    prob_equilibrio: pd.Series     # P(break-even atingido até o mês N)
+
+
+def distribuicao_relativa(tipo, centro, desvio_rel):
+    """Atalho para a UI: distribuição centrada em `centro` com dispersão relativa."""
+    if tipo == 'triangular':
+        return ('triangular', centro * (1 - desvio_rel), centro, centro * (1 + desvio_rel))
+    return ('normal', centro, abs(centro) * desvio_rel)
+
+
+def _amostrar(rng, dist, tamanho):
+    tipo, *args = dist
+    if tipo == 'normal':
+        return rng.normal(args[0], args[1], tamanho)
+    if tipo == 'triangular':
+        minimo, moda, maximo = args
+        if maximo <= minimo:  # distribuição degenerada
+            return np.full(tamanho, float(moda))
+        return rng.triangular(minimo, moda, maximo, tamanho)
+    if tipo == 'uniforme':
+        return rng.uniform(args[0], args[1], tamanho)
+    raise ValueError(f"Distribuição desconhecida: {tipo}")
+
+
+def simular(base, distribuicoes, n=50_000, meses=12, por_mes=False, semente=42, bloco=None):
+    """Roda `n` caminhos a partir de `base` (Parametros) e resume em bandas P10/P50/P90.
+
+    Amostras negativas são truncadas em zero e o churn é limitado a 100%. Sem
+    `bloco`, os caminhos por bloco diminuem com o horizonte (`lote.bloco_para`).
+    """
+    desconhecidas = set(distribuicoes) - set(VARIAVEIS)
+    if desconhecidas:
+        raise KeyError(f"Sem suporte a distribuição para: {sorted(desconhecidas)}")
+
+    rng = np.random.default_rng(semente)
+    tamanho = (n, meses) if por_mes else (n,)
+    amostras = {
+        k: np.clip(_amostrar(rng, dist, tamanho), 0.0, 1.0 if k == 'churn' else None)
+        for k, dist in distribuicoes.items()
+    }
+
+    bloco = bloco or bloco_para(meses)
+    v = base._asdict()
+    acumulado = {nome: np.empty((n, meses)) for nome in LINHAS_BANDAS}
+    equilibrio = np.empty((n, meses), dtype=bool)
+    for i in range(0, n, bloco):
+        fatia = {k: a[i:i + bloco] for k, a in amostras.items()}
+        if por_mes:
+            res = _linhas({k: x for k, x in v.items() if k not in fatia}, meses, mensais=fatia)
+        else:
+            res = _linhas({**v, **fatia}, meses)
+        for nome in LINHAS_BANDAS:
+            acumulado[nome][i:i + bloco] = res[nome]
+        pe = res['7. Ponto Equilíbrio (R$)']
+        equilibrio[i:i + bloco] = (pe > 0) & (res['2.1 Receita Bruta'] >= pe)
+
+    rotulos = rotulos_meses(meses)
+    bandas = pd.DataFrame(
+        {(nome, p): np.percentile(acumulado[nome], q, axis=0) for nome in LINHAS_BANDAS for p, q in PERCENTIS.items()},
+        index=pd.Index(rotulos, name='Mês'),
+    )
+    atingido = np.logical_or.accumulate(equilibrio, axis=1)
+    prob = pd.Series(atingido.mean(axis=0), index=rotulos, name='P(Break-Even)')
+    return ResultadoMC(bandas, prob)
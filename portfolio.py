@@ -0,0 +1,129 @@
+"""Modo portfólio: ingestão em massa de parâmetros de várias empresas.
+
+Aceita o formato longo do `gerar_template_csv` com uma coluna extra `Empresa`
+(Empresa, Codigo_Interno, Valor) ou o formato largo (uma linha por empresa,
+uma coluna por `Codigo_Interno`). A validação, a projeção e a consolidação
+são feitas para todas as empresas de uma vez.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from lote import CHAVES, avaliar_lote
+from modelo import ORDEM, Parametros, _razao, rotulos_meses
+
+COL_EMPRESA = 'Empresa'
+# Únicos inputs que aceitam valor negativo / limitados a 100%
+PODE_NEGATIVO = {'fin'}
+TAXAS_ATE_1 = ['churn', 'comissao', 'imposto', 'taxa', 'irpj']
+
+# Linhas somadas na consolidação; as demais são recalculadas sobre as somas
+ADITIVAS = [
+    "1. Clientes Ativos", "1.1 Novos", "1.2 Churn (Qtd)", "2. MRR (Recorrente)", "2.1 Receita Bruta",
+    "(-) Impostos", "3. Receita Líquida", "(-) COGS (Entrega)", "(-) Comissões/Taxas",
+    "4. Margem Contribuição", "(-) Folha + Encargos", "(-) Mkt + Fixos", "5. EBITDA",
+    "(-) Deprec/Amort", "(+/-) Res. Financeiro", "6. Lucro Líquido",
+]
+
+
+class Portfolio(NamedTuple):
+    params: pd.DataFrame      # índice: Empresa; colunas: CHAVES (apenas empresas válidas)
+    problemas: pd.DataFrame   # Empresa, Codigo_Interno, Problema
+
+
+def ler_arquivo(arquivo, nome=''):
+    """Lê CSV ou Parquet."""
+    if str(nome or getattr(arquivo, 'name', arquivo)).lower().endswith('.parquet'):
+        return pd.read_parquet(arquivo)
+    return pd.read_csv(arquivo)
+
+
+def _para_largo(df):
+    if 'Codigo_Interno' not in df.columns:
+        dup = df[COL_EMPRESA].astype(str).duplicated(keep='first')
+        problemas = df.loc[dup, [COL_EMPRESA]].assign(Codigo_Interno='*', Problema='Empresa duplicada (mantida a primeira linha)')
+        return df[~dup].set_index(COL_EMPRESA), problemas
+    dup = df.duplicated([COL_EMPRESA, 'Codigo_Interno'], keep='first')
+    problemas = df.loc[dup, [COL_EMPRESA, 'Codigo_Interno']].assign(Problema='Código duplicado (mantido o primeiro)')
+    largo = df[~dup].pivot(index=COL_EMPRESA, columns='Codigo_Interno', values='Valor')
+    return largo, problemas
+
+
+def validar(df):
+    """Normaliza para o formato largo e valida todas as células de uma vez.
+
+    Códigos desconhecidos são ignorados e valores ausentes assumem o padrão;
+    empresas com valor não numérico, negativo ou taxa acima de 100% são
+    descartadas e listadas em `problemas`.
+    """
+    if COL_EMPRESA not in df.columns:
+        raise KeyError(f"Coluna '{COL_EMPRESA}' não encontrada.")
+    largo, problemas = _para_largo(df)
+    largo.index = largo.index.astype(str)
+    desconhecidas = [c for c in largo.columns if c not in CHAVES]
+    bruto = largo.reindex(columns=CHAVES)
+    numerico = bruto.apply(pd.to_numeric, errors='coerce')
+
+    mascaras = {
+        'Valor não numérico': numerico.isna() & bruto.notna(),
+        'Valor negativo': (numerico < 0) & ~numerico.columns.isin(list(PODE_NEGATIVO)),
+        'Taxa acima de 100%': (numerico > 1) & numerico.columns.isin(TAXAS_ATE_1),
+    }
+    achados = [problemas]
+    for texto, mascara in mascaras.items():
+        marcados = mascara.stack()
+        marcados = marcados[marcados].index.to_frame(index=False, name=[COL_EMPRESA, 'Codigo_Interno'])
+        achados.append(marcados.assign(Problema=texto))
+    if desconhecidas:
+        achados.append(pd.DataFrame({COL_EMPRESA: '*', 'Codigo_Interno': desconhecidas, 'Problema': 'Código desconhecido (ignorado)'}))
+    problemas = pd.concat(achados, ignore_index=True)
+
+    invalidas = np.logical_or.reduce([m.to_numpy().any(axis=1) for m in mascaras.values()])
+    params = numerico[~invalidas].fillna(pd.Series(Parametros()._asdict()))
+    return Portfolio(params, problemas)
+
+
+def projetar_portfolio(params, meses=12):
+    """Tensor empresas x meses x K com a DRE de cada empresa."""
+    return avaliar_lote(params.to_numpy(dtype=float), meses)
+
+
+def consolidar(tensor):
+    """DRE consolidada do portfólio (índice: ORDEM; colunas: meses).
+
+    Valores absolutos são somados; indicadores são recalculados sobre os totais
+    (CAC ponderado por novos, LTV por clientes, NRR por MRR).
+    """
+    i = {nome: k for k, nome in enumerate(ORDEM)}
+    soma = tensor.sum(axis=0)
+    out = {nome: soma[:, i[nome]] for nome in ADITIVAS}
+    linha = lambda nome: tensor[:, :, i[nome]]
+
+    mb_pct = _razao(out["4. Margem Contribuição"], out["2.1 Receita Bruta"])
+    fixos = out["(-) Folha + Encargos"] + out["(-) Mkt + Fixos"] + out["(-) Deprec/Amort"] - out["(+/-) Res. Financeiro"]
+    out["1.3 Ticket Médio"] = _razao(out["2. MRR (Recorrente)"], out["1. Clientes Ativos"])
+    out["7. Ponto Equilíbrio (R$)"] = _razao(fixos, mb_pct)
+    out["Fator R (%)"] = _razao(out["(-) Folha + Encargos"], out["2.1 Receita Bruta"])
+    out["CAC (R$)"] = _razao((linha("CAC (R$)") * linha("1.1 Novos")).sum(axis=0), out["1.1 Novos"])
+    out["LTV (R$)"] = _razao((linha("LTV (R$)") * linha("1. Clientes Ativos")).sum(axis=0), out["1. Clientes Ativos"])
+    mc_pct = _razao(out["4. Margem Contribuição"], out["3. Receita Líquida"])
+    out["Payback (Meses)"] = _razao(out["CAC (R$)"], out["1.3 Ticket Médio"] * mc_pct)
+    out["NRR (Estimado)"] = _razao((linha("NRR (Estimado)") * linha("2. MRR (Recorrente)")).sum(axis=0), out["2. MRR (Recorrente)"])
+    return pd.DataFrame(np.vstack([out[nome] for nome in ORDEM]), index=ORDEM, columns=rotulos_meses(tensor.shape[1]))
+
+
+def ranking(tensor, empresas, mes=-1):
+    """KPIs de cada empresa no mês indicado, ordenados por LTV/CAC."""
+    i = {nome: k for k, nome in enumerate(ORDEM)}
+    f = tensor[:, mes, :]
+    df = pd.DataFrame({
+        'LTV/CAC': _razao(f[:, i['LTV (R$)']], f[:, i['CAC (R$)']]),
+        'NRR': f[:, i['NRR (Estimado)']],
+        'Payback (Meses)': f[:, i['Payback (Meses)']],
+        'Receita Bruta': f[:, i['2.1 Receita Bruta']],
+        'EBITDA': f[:, i['5. EBITDA']],
+        'Lucro Líquido': f[:, i['6. Lucro Líquido']],
+        'Clientes': f[:, i['1. Clientes Ativos']],
+    }, index=pd.Index(empresas, name=COL_EMPRESA))
+    return df.sort_values('LTV/CAC', ascending=False)
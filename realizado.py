@@ -0,0 +1,347 @@
+"""Realizado x plano: ingestão incremental de lançamentos contábeis (razão do ERP).
+
+O CSV exportado (Data, Conta, Valor) é lido em blocos de `BLOCO` linhas; cada
+conta é levada a uma linha da DRE pelo mapa de contas (prefixo mais longo
+vence) e somada no mês do lançamento. Só ficam em memória os agregados mensais,
+então o consumo não depende do tamanho do arquivo. Cada arquivo guarda a
+posição (em bytes) até onde foi lido: reingerir um export que recebeu linhas
+novas no fim processa apenas essas linhas.
+
+    real = Realizado(ler_mapa(pd.read_csv('mapa_contas.csv')))
+    real.ingerir('razao_2026.csv')
+    real.salvar('realizado.json')          # retoma depois com Realizado.carregar
+    dif = variancia(dre_dataframe(params, 12), real, inicio='2026-01')
+"""
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from cenarios import comparar
+from modelo import FLUXOS, ORDEM, PERIODOS, _razao
+from relatorio import tabela_dre
+
+BLOCO = 500_000
+DIRETORIO_ENV = 'VAIONTEC_RAZAO_DIR'  # único diretório de onde o app lê razões no servidor
+
+# Linhas que vêm direto do razão; as demais monetárias são derivadas delas
+LANCAVEIS = [
+    "2.1 Receita Bruta", "(-) Impostos", "(-) COGS (Entrega)", "(-) Comissões/Taxas",
+    "(-) Folha + Encargos", "(-) Mkt + Fixos", "(-) Deprec/Amort", "(+/-) Res. Financeiro",
+]
+IR = "(-) IRPJ/CSLL"  # não é linha da DRE: separa o lucro antes do IR do Lucro Líquido
+DESTINOS = LANCAVEIS + [IR]
+# Sem contagem de clientes no razão, estas linhas não têm realizado
+SEM_REALIZADO = [
+    "1. Clientes Ativos", "1.1 Novos", "1.2 Churn (Qtd)", "1.3 Ticket Médio", "2. MRR (Recorrente)",
+    "CAC (R$)", "LTV (R$)", "Payback (Meses)", "NRR (Estimado)",
+]
+
+
+class Formato(NamedTuple):
+    data: str = 'Data'
+    conta: str = 'Conta'
+    valor: str = 'Valor'
+    sep: str = ','
+    decimal: str = '.'        # ',' para exports com 1.234,56 (use milhar='.')
+    milhar: str = None
+    encoding: str = 'utf-8'
+    dayfirst: bool = False    # só sem `formato_data`
+    formato_data: str = 'ISO8601'  # ou strftime, ex.: '%d/%m/%Y'; None infere a cada bloco (ambíguo)
+
+
+class Regra(NamedTuple):
+    prefixo: str              # código da conta ou prefixo do plano de contas ('3.1', '4.2.01'...)
+    linha: str                # um de DESTINOS
+    sinal: float = 1.0        # -1 para contas cujo saldo vem com sinal invertido
+
+
+def ler_mapa(df):
+    """Regras a partir de um DataFrame com as colunas Conta, Linha e (opcional) Sinal."""
+    faltando = {'Conta', 'Linha'} - set(df.columns)
+    if faltando:
+        raise KeyError(f"Mapa de contas sem as colunas: {sorted(faltando)}")
+    invalidas = sorted(set(df['Linha']) - set(DESTINOS))
+    if invalidas:
+        raise ValueError(f"Linhas desconhecidas no mapa: {invalidas}. Use uma de {DESTINOS}.")
+    sinais = df['Sinal'].fillna(1.0) if 'Sinal' in df.columns else pd.Series(1.0, index=df.index)
+    return [Regra(str(c).strip(), l, float(s)) for c, l, s in zip(df['Conta'], df['Linha'], sinais)]
+
+
+def diretorio_razoes():
+    """Diretório configurado para razões no servidor (None: leitura por caminho desligada)."""
+    return os.environ.get(DIRETORIO_ENV) or None
+
+
+def caminho_no_diretorio(caminho, base):
+    """Resolve `caminho` (relativo a `base`) e recusa qualquer destino fora de `base`."""
+    base = Path(base).resolve()
+    alvo = (base / caminho).resolve()
+    if not alvo.is_relative_to(base):
+        raise ValueError(f"O razão precisa estar dentro de {DIRETORIO_ENV}.")
+    return alvo
+
+
+class _Trecho(io.RawIOBase):
+    """Leitura de um arquivo até a posição `fim` (exclusiva)."""
+
+    def __init__(self, arquivo, fim):
+        self.arquivo, self.resta = arquivo, fim - arquivo.tell()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.arquivo.readinto(memoryview(buffer)[:max(0, self.resta)])
+        self.resta -= n
+        return n
+
+
+def _fim_da_ultima_linha(arquivo, tamanho):
+    """Posição logo após o último '\\n': uma linha ainda sendo escrita fica para a próxima leitura."""
+    pos = tamanho
+    while pos > 0:
+        passo = min(pos, 1 << 16)
+        arquivo.seek(pos - passo)
+        i = arquivo.read(passo).rfind(b'\n')
+        if i >= 0:
+            return pos - passo + i + 1
+        pos -= passo
+    return 0
+
+
+def _numeros(textos, fmt):
+    """Valores do razão no formato `fmt`, célula a célula: só a ilegível vira NaN."""
+    textos = textos.astype(str).str.strip()
+    if fmt.milhar:
+        textos = textos.str.replace(fmt.milhar, '', regex=False)
+    if fmt.decimal != '.':
+        textos = textos.str.replace(fmt.decimal, '.', regex=False)
+    return pd.to_numeric(textos, errors='coerce')
+
+
+def _assinatura(arquivo, fim):
+    """SHA-1 dos primeiros `fim` bytes do arquivo."""
+    h = hashlib.sha1()
+    arquivo.seek(0)
+    while fim > 0:
+        parte = arquivo.read(min(fim, 1 << 20))
+        if not parte:
+            break
+        h.update(parte)
+        fim -= len(parte)
+    return h.hexdigest()
+
+
+def _rotulo_mes(indice):
+    return f"{indice // 12:04d}-{indice % 12 + 1:02d}"
+
+
+def _indice_mes(rotulo):
+    p = pd.Period(rotulo, freq='M')
+    return p.year * 12 + p.month - 1
+
+
+class Realizado:
+    """Agregados mensais do razão por linha da DRE, atualizados bloco a bloco."""
+
+    def __init__(self, regras, formato=Formato()):
+        self.regras = sorted(regras, key=lambda r: len(r.prefixo), reverse=True)
+        self.formato = formato
+        self.meses = {}           # ano * 12 + mês - 1 -> array len(DESTINOS)
+        self.nao_mapeadas = {}    # conta -> soma dos valores ignorados
+        self.linhas = 0
+        self.rejeitadas = 0       # data ou valor ilegível
+        self.posicoes = {}        # arquivo -> {'bytes': posição lida, 'colunas': cabeçalho}
+        self._destinos = {}       # cache conta -> (índice em DESTINOS ou -1, sinal)
+
+    def _destino(self, conta):
+        if conta not in self._destinos:
+            regra = next((r for r in self.regras if conta.startswith(r.prefixo)), None)
+            self._destinos[conta] = (-1, 0.0) if regra is None else (DESTINOS.index(regra.linha), regra.sinal)
+        return self._destinos[conta]
+
+    def _acumular(self, bloco):
+        fmt = self.formato
+        # Datas também se repetem muito: converte só as distintas e espalha o mês
+        cod_data, datas = pd.factorize(bloco[fmt.data], use_na_sentinel=False)
+        if fmt.formato_data:
+            datas = pd.to_datetime(datas, format=fmt.formato_data, errors='coerce')
+        else:
+            datas = pd.to_datetime(datas, dayfirst=fmt.dayfirst, errors='coerce')
+        mes = np.asarray(datas.year * 12 + datas.month - 1, dtype=float)[cod_data]
+        valores = bloco[fmt.valor]
+        if not pd.api.types.is_numeric_dtype(valores):
+            # Uma célula ilegível deixa a coluna inteira do bloco como texto
+            valores = _numeros(valores, fmt)
+        valores = valores.to_numpy(dtype=float)
+        ok = ~np.isnan(mes) & ~np.isnan(valores)
+        self.linhas += len(bloco)
+        self.rejeitadas += int((~ok).sum())
+        mes, valores = mes[ok].astype(int), valores[ok]
+
+        # Contas são poucas perto das linhas: resolve o mapa só para as distintas do bloco
+        cod_conta, contas = pd.factorize(bloco[fmt.conta][ok].astype(str).str.strip())
+        destino = np.array([self._destino(c) for c in contas], dtype=float).reshape(-1, 2)
+        linha, sinal = destino[cod_conta, 0].astype(int), destino[cod_conta, 1]
+
+        mapeado = linha >= 0
+        if not mapeado.all():
+            soltas = np.bincount(cod_conta[~mapeado], weights=valores[~mapeado], minlength=len(contas))
+            for i in np.flatnonzero(~(destino[:, 0] >= 0)):
+                self.nao_mapeadas[contas[i]] = self.nao_mapeadas.get(contas[i], 0.0) + soltas[i]
+
+        cod_mes, meses = pd.factorize(mes[mapeado])
+        k = len(DESTINOS)
+        somas = np.bincount(cod_mes * k + linha[mapeado], weights=valores[mapeado] * sinal[mapeado],
+                            minlength=len(meses) * k).reshape(len(meses), k)
+        for m, soma in zip(meses, somas):
+            self.meses[int(m)] = self.meses.get(int(m), 0.0) + soma
+
+    def _ler(self, fonte, bloco, **kw):
+        fmt = self.formato
+        leitor = pd.read_csv(fonte, sep=fmt.sep, decimal=fmt.decimal, thousands=fmt.milhar, encoding=fmt.encoding,
+                             dtype={fmt.conta: str}, chunksize=bloco, **kw)
+        with leitor:
+            for parte in leitor:
+                self._acumular(parte)
+
+    def ingerir(self, fonte, bloco=BLOCO, final=False, chave=None):
+        """Processa as linhas ainda não lidas de `fonte`; retorna quantas foram lidas agora.
+
+        `fonte` é um caminho (leitura incremental, retomada pela posição salva) ou um
+        arquivo aberto / buffer, lido por inteiro. Num caminho, uma última linha sem
+        '\\n' fica pendente (pode estar sendo escrita; ver `pendente`) até que
+        `final=True` indique que o export terminou.
+
+        Com `chave`, um arquivo aberto / buffer binário também é incremental: versões
+        sucessivas do mesmo export cumulativo (ex.: uploads) só têm lidos os bytes
+        novos no fim, e um início diferente do já lido é recusado.
+        """
+        antes = self.linhas
+        fmt = self.formato
+        if isinstance(fonte, (str, os.PathLike)):
+            with open(fonte, 'rb') as f:
+                self._incremental(f, os.path.abspath(fonte), bloco, final, conferir=False)
+        elif chave is not None:
+            self._incremental(fonte, chave, bloco, final, conferir=True)
+        else:
+            self._ler(fonte, bloco, usecols=[fmt.data, fmt.conta, fmt.valor])
+        return self.linhas - antes
+
+    def _incremental(self, f, chave, bloco, final, conferir):
+        fmt = self.formato
+        estado = self.posicoes.get(chave, {'bytes': 0, 'colunas': None})
+        tamanho = f.seek(0, os.SEEK_END)
+        if tamanho < estado['bytes']:
+            raise ValueError(f"{chave} encolheu desde a última leitura; reingira num Realizado novo.")
+        # Num arquivo do servidor o início não muda; numa nova cópia (upload) é conferido
+        if conferir and estado['bytes'] and _assinatura(f, estado['bytes']) != estado.get('assinatura'):
+            raise ValueError(f"{chave} não continua o arquivo já lido; reingira num Realizado novo.")
+        fim = tamanho if final else _fim_da_ultima_linha(f, tamanho)
+        estado['pendente'] = tamanho - fim
+        self.posicoes[chave] = estado
+        if fim <= estado['bytes']:
+            return
+        f.seek(estado['bytes'])
+        trecho = io.BufferedReader(_Trecho(f, fim))
+        if estado['colunas'] is None:
+            estado['colunas'] = list(pd.read_csv(trecho, sep=fmt.sep, encoding=fmt.encoding, nrows=0).columns)
+            f.seek(0)
+            trecho = io.BufferedReader(_Trecho(f, fim))
+            self._ler(trecho, bloco, usecols=[fmt.data, fmt.conta, fmt.valor])
+        else:
+            self._ler(trecho, bloco, header=None, names=estado['colunas'], usecols=[fmt.data, fmt.conta, fmt.valor])
+        estado['bytes'] = fim
+        if conferir:
+            estado['assinatura'] = _assinatura(f, fim)
+
+    def pendente(self):
+        """Bytes no fim dos arquivos ainda sem '\\n' (não lidos), por arquivo."""
+        return {k: e['pendente'] for k, e in self.posicoes.items() if e.get('pendente')}
+
+    def mensal(self):
+        """Agregados por mês (índice 'AAAA-MM') e destino do mapa de contas."""
+        meses = sorted(self.meses)
+        valores = np.vstack([self.meses[m] for m in meses]) if meses else np.empty((0, len(DESTINOS)))
+        return pd.DataFrame(valores, index=pd.Index([_rotulo_mes(m) for m in meses], name='Mês'), columns=DESTINOS)
+
+    # --- persistência (JSON: agregados, posições e mapa; nunca as linhas) ---
+    def salvar(self, caminho):
+        estado = {
+            'regras': [r._asdict() for r in self.regras], 'formato': self.formato._asdict(),
+            'meses': {_rotulo_mes(m): v.tolist() for m, v in sorted(self.meses.items())},
+            'nao_mapeadas': self.nao_mapeadas, 'linhas': self.linhas, 'rejeitadas': self.rejeitadas,
+            'posicoes': self.posicoes,
+        }
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(estado, f, ensure_ascii=False)
+
+    @classmethod
+    def carregar(cls, caminho):
+        with open(caminho, encoding='utf-8') as f:
+            estado = json.load(f)
+        real = cls([Regra(**r) for r in estado['regras']], Formato(**estado['formato']))
+        real.meses = {_indice_mes(m): np.array(v) for m, v in estado['meses'].items()}
+        real.nao_mapeadas, real.posicoes = estado['nao_mapeadas'], estado['posicoes']
+        real.linhas, real.rejeitadas = estado['linhas'], estado['rejeitadas']
+        return real
+
+
+def dre_realizada(real, inicio, meses=12):
+    """Realizado no formato de `dre_dataframe`: mês 1 = `inicio` ('AAAA-MM').
+
+    Meses sem lançamento e linhas sem realizado (contagens, CAC, LTV...) ficam NaN.
+    """
+    rotulos = [str(p) for p in pd.period_range(inicio, periods=meses, freq='M')]
+    base = real.mensal().reindex(rotulos).to_numpy()
+    v = dict(zip(DESTINOS, base.T))
+    linhas = dict.fromkeys(ORDEM, np.full(meses, np.nan))
+    linhas.update({nome: v[nome] for nome in LANCAVEIS})
+    rb = v["2.1 Receita Bruta"]
+    linhas["3. Receita Líquida"] = rb - v["(-) Impostos"]
+    linhas["4. Margem Contribuição"] = linhas["3. Receita Líquida"] - v["(-) COGS (Entrega)"] - v["(-) Comissões/Taxas"]
+    linhas["5. EBITDA"] = linhas["4. Margem Contribuição"] - v["(-) Folha + Encargos"] - v["(-) Mkt + Fixos"]
+    linhas["6. Lucro Líquido"] = linhas["5. EBITDA"] - v["(-) Deprec/Amort"] + v["(+/-) Res. Financeiro"] - v[IR]
+    # Mesmos indicadores do plano, sobre o realizado; meses sem lançamento ficam NaN
+    sem_dados = np.isnan(rb)
+    fixos = v["(-) Folha + Encargos"] + v["(-) Mkt + Fixos"] + v["(-) Deprec/Amort"] - v["(+/-) Res. Financeiro"]
+    mb_pct = _razao(linhas["4. Margem Contribuição"], rb)
+    linhas["7. Ponto Equilíbrio (R$)"] = np.where(sem_dados, np.nan, _razao(fixos, mb_pct))
+    linhas["Fator R (%)"] = np.where(sem_dados, np.nan, _razao(v["(-) Folha + Encargos"], rb))
+    df = pd.DataFrame(linhas)[ORDEM]
+    df.insert(0, 'Mês', rotulos)
+    return df
+
+
+def variancia(df_plano, real, inicio, periodo='Mensal'):
+    """Plano x realizado por linha e período (`cenarios.Diferenca`: a = plano, b = realizado).
+
+    `df_plano` é a projeção mensal (`dre_dataframe`) e `inicio` o mês calendário
+    do seu Mês 1. Na visão mensal as colunas ganham o rótulo 'AAAA-MM'. Um
+    trimestre ou ano com realizado só em parte dos meses compara o acumulado
+    desses meses (plano e realizado); períodos sem realizado ficam NaN.
+    """
+    df_real = dre_realizada(real, inicio, len(df_plano))
+    com_dados = df_real["2.1 Receita Bruta"].notna().to_numpy()
+    # Meses sem realizado não entram nos fluxos de nenhum dos lados
+    df_real[FLUXOS] = df_real[FLUXOS].fillna(0.0)
+    plano_parcial = df_plano.copy()
+    plano_parcial.loc[~com_dados, FLUXOS] = 0.0
+    plano, parcial = tabela_dre(df_plano, periodo), tabela_dre(plano_parcial, periodo)
+    realizado = tabela_dre(df_real, periodo)
+
+    k = PERIODOS[periodo]
+    periodo_com_dados = np.logical_or.reduceat(com_dados, np.arange(0, len(com_dados), k))
+    medidas = realizado.index.difference(SEM_REALIZADO, sort=False)
+    plano.loc[medidas, periodo_com_dados] = parcial.loc[medidas, periodo_com_dados]
+    realizado.loc[SEM_REALIZADO] = np.nan
+    realizado.loc[:, ~periodo_com_dados] = np.nan
+    if periodo == 'Mensal':
+        plano.columns = realizado.columns = df_real['Mês']
+    return comparar(plano, realizado)
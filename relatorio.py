@@ -0,0 +1,61 @@
+"""Montagem e formatação da tabela DRE a partir do motor de projeção."""
+import numpy as np
+import pandas as pd
+
+from coortes import projetar_curvas
+from modelo import ORDEM, agregar, key_map, projetar, rotulos_meses, rotulos_periodos
+
+
+def dre_dataframe(params, meses=12, curvas=None):
+    """Projeção em formato tabular: uma linha por mês, coluna 'Mês' + linhas da DRE.
+
+    Com `curvas` (coortes.Curvas) a receita vem do motor de coortes.
+    """
+    linhas = projetar(params, meses) if curvas is None else projetar_curvas(params, curvas, meses).linhas
+    df = pd.DataFrame(linhas)
+    df.insert(0, 'Mês', rotulos_meses(meses))
+    return df
+
+
+def tabela_dre(df_raw, periodo='Mensal'):
+    """DRE transposta: linhas na ordem de `ORDEM`, uma coluna por período."""
+    linhas = agregar({nome: df_raw[nome].to_numpy() for nome in ORDEM}, periodo)
+    return pd.DataFrame(np.vstack([linhas[nome] for nome in ORDEM]), index=ORDEM,
+                        columns=rotulos_periodos(len(df_raw), periodo))
+
+
+def _tipo_linha(nome):
+    if any(x in nome for x in ['%', 'NRR', 'Fator']): return 'pct'
+    if any(x in nome for x in ['Clientes', 'Novos', 'Churn']): return 'qtd'
+    if 'Meses' in nome: return 'meses'
+    return 'moeda'
+
+
+# Tipo de cada linha resolvido uma única vez, não a cada célula
+TIPO_LINHA = {nome: _tipo_linha(nome) for nome in ORDEM}
+FORMATOS = {'pct': "{:.1%}", 'qtd': "{:.0f}", 'meses': "{:.1f}", 'moeda': "R$ {:,.2f}"}
+
+
+def formatar_dre(df_dre):
+    """Tabela de exibição: cada linha é formatada de uma vez com o formato do seu tipo."""
+    valores = df_dre.to_numpy(dtype=float)
+    texto = np.empty(valores.shape, dtype=object)
+    for i, nome in enumerate(df_dre.index):
+        texto[i] = list(map(FORMATOS[TIPO_LINHA.get(nome, 'moeda')].format, valores[i]))
+    texto[np.isnan(valores)] = "-"
+    return pd.DataFrame(texto, index=df_dre.index, columns=df_dre.columns)
+
+
+def template_parametros(params):
+    """Planilha de inputs (Parametro, Valor, Codigo_Interno) com os valores de `params`."""
+    return pd.DataFrame({
+        'Parametro': [key_map.get(k, k) for k in params._fields],
+        'Valor': list(params),
+        'Codigo_Interno': list(params._fields),
+    })
+
+
+def valores_do_template(df_up):
+    """{Codigo_Interno: valor} das linhas do template com código conhecido."""
+    validos = df_up[df_up['Codigo_Interno'].isin(list(key_map))]
+    return dict(zip(validos['Codigo_Interno'], validos['Valor'].astype(float)))
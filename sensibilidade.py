@@ -0,0 +1,56 @@
+"""Análise de sensibilidade (tornado) e mapas de calor sobre o motor da DRE.
+
+Todas as perturbações de uma análise viram linhas de um único lote e são
+avaliadas numa só chamada de `avaliar_lote`.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from lote import CHAVES, avaliar_lote, montar_grade
+from modelo import ORDEM
+
+# Indicadores avaliados no último mês do horizonte
+KPIS = ['6. Lucro Líquido', '5. EBITDA', 'Payback (Meses)', '7. Ponto Equilíbrio (R$)']
+
+
+class ResultadoTornado(NamedTuple):
+    base: pd.Series        # KPI no cenário base
+    baixo: pd.DataFrame    # KPI com cada parâmetro em -delta (índice: chave)
+    alto: pd.DataFrame     # KPI com cada parâmetro em +delta
+
+
+def tornado(base, delta=0.10, meses=12, chaves=CHAVES, kpis=KPIS):
+    """Perturba cada chave em ±delta (relativo) mantendo as demais no `base`."""
+    colunas = [CHAVES.index(k) for k in chaves]
+    idx_kpis = [ORDEM.index(k) for k in kpis]
+    n = len(colunas)
+
+    # Linha 0: base; 1..n: -delta; n+1..2n: +delta
+    matriz = np.tile(np.asarray(base, dtype=float), (2 * n + 1, 1))
+    matriz[np.arange(1, n + 1), colunas] *= 1 - delta
+    matriz[np.arange(n + 1, 2 * n + 1), colunas] *= 1 + delta
+
+    finais = avaliar_lote(matriz, meses)[:, -1, idx_kpis]
+    return ResultadoTornado(
+        pd.Series(finais[0], index=kpis),
+        pd.DataFrame(finais[1:n + 1], index=list(chaves), columns=kpis),
+        pd.DataFrame(finais[n + 1:], index=list(chaves), columns=kpis),
+    )
+
+
+def ordenar_por_impacto(res, kpi):
+    """Amplitudes |alto - baixo| do KPI, em ordem decrescente (para o gráfico tornado)."""
+    amplitude = (res.alto[kpi] - res.baixo[kpi]).abs()
+    return amplitude.sort_values(ascending=False)
+
+
+def mapa_calor(base, chave_x, valores_x, chave_y, valores_y, kpi='6. Lucro Líquido', meses=12):
+    """KPI do último mês para cada par (y, x): DataFrame com índice valores_y e colunas valores_x."""
+    if chave_x == chave_y:
+        raise ValueError("Escolha dois parâmetros diferentes para o mapa de calor.")
+    grade = montar_grade(base, **{chave_y: valores_y, chave_x: valores_x})
+    finais = avaliar_lote(grade, meses)[:, -1, ORDEM.index(kpi)]
+    return pd.DataFrame(finais.reshape(len(valores_y), len(valores_x)),
+                        index=pd.Index(valores_y, name=chave_y), columns=pd.Index(valores_x, name=chave_x))
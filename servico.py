@@ -0,0 +1,214 @@
+"""Serviço headless da projeção: CLI e endpoint HTTP local, sem Streamlit.
+
+A entrada segue o formato do `gerar_template_csv` (CSV com Parametro, Valor,
+Codigo_Interno, ou JSON com a mesma lista de registros) ou um objeto JSON
+{codigo: valor}; chaves ausentes assumem os `defaults`. A saída é a DRE em
+JSON, CSV ou Parquet.
+
+    python servico.py projetar inputs.csv --meses 60 --periodo Anual --formato csv
+    python servico.py servir --porta 8765 --workers 8
+
+    curl -X POST 'localhost:8765/projecao?meses=24&formato=csv' \\
+         -H 'Content-Type: text/csv' --data-binary @modelo_inputs.csv
+
+Só o motor (numpy/pandas) é importado, uma vez por processo; respostas de
+conjuntos de parâmetros repetidos saem de um cache LRU.
+"""
+import argparse
+import io
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from cache_projecao import tabela_cacheada
+from modelo import PERIODOS, Parametros, defaults
+from relatorio import valores_do_template
+
+FORMATOS = {'json': 'application/json', 'csv': 'text/csv; charset=utf-8', 'parquet': 'application/vnd.apache.parquet'}
+MAX_MESES = 600
+
+
+class ErroEntrada(ValueError):
+    """Requisição inválida (vira HTTP 400 / saída com erro na CLI)."""
+
+
+def ler_parametros(conteudo, tipo='json'):
+    """Parametros a partir de um corpo JSON ou CSV no formato do template."""
+    try:
+        if tipo == 'csv':
+            dados = pd.read_csv(io.BytesIO(conteudo))
+        else:
+            dados = json.loads(conteudo or b'{}')
+    except (ValueError, pd.errors.ParserError) as e:
+        raise ErroEntrada(f"Entrada ilegível: {e}") from e
+
+    if isinstance(dados, dict):
+        desconhecidas = set(dados) - set(defaults)
+        if desconhecidas:
+            raise ErroEntrada(f"Parâmetros desconhecidos: {sorted(desconhecidas)}")
+        valores = dados
+    elif isinstance(dados, (list, pd.DataFrame)):
+        try:
+            df = dados if isinstance(dados, pd.DataFrame) else pd.DataFrame(dados)
+        except (TypeError, ValueError) as e:
+            raise ErroEntrada(f"Entrada ilegível: {e}") from e
+        if 'Codigo_Interno' not in df.columns or 'Valor' not in df.columns:
+            raise ErroEntrada("Esperadas as colunas Codigo_Interno e Valor.")
+        try:
+            valores = valores_do_template(df)
+        except (TypeError, ValueError) as e:
+            raise ErroEntrada(f"Valor não numérico: {e}") from e
+        if not valores:
+            raise ErroEntrada("Nenhum código válido encontrado.")
+    else:
+        raise ErroEntrada("Esperado um objeto {codigo: valor} ou uma lista de registros do template.")
+    try:
+        return Parametros(**{**defaults, **{k: float(v) for k, v in valores.items()}})
+    except (TypeError, ValueError) as e:
+        raise ErroEntrada(f"Valor não numérico: {e}") from e
+
+
+def _validar_opcoes(meses, periodo, formato):
+    if not 1 <= meses <= MAX_MESES:
+        raise ErroEntrada(f"meses deve estar entre 1 e {MAX_MESES}.")
+    if periodo not in PERIODOS:
+        raise ErroEntrada(f"periodo deve ser um de {list(PERIODOS)}.")
+    if formato not in FORMATOS:
+        raise ErroEntrada(f"formato deve ser um de {list(FORMATOS)}.")
+
+
+def serializar(df_dre, formato):
+    if formato == 'csv':
+        return df_dre.to_csv().encode('utf-8')
+    if formato == 'parquet':
+        buf = io.BytesIO()
+        df_dre.rename_axis('Linha').reset_index().to_parquet(buf, index=False)
+        return buf.getvalue()
+    corpo = {'periodos': list(df_dre.columns), 'dre': {linha: df_dre.loc[linha].tolist() for linha in df_dre.index}}
+    return json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+
+
+@lru_cache(maxsize=256)
+def responder(params, meses=12, periodo='Mensal', formato='json'):
+    """Bytes da DRE serializada; cacheado por (parâmetros, horizonte, visão, formato)."""
+    _validar_opcoes(meses, periodo, formato)
+    df_dre, _ = tabela_cacheada(params, meses, periodo)
+    return serializar(df_dre, formato)
+
+
+# --- HTTP ---
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'VaiontecDRE/1.0'
+
+    def _enviar(self, status, corpo, tipo='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _erro(self, status, mensagem):
+        self._enviar(status, json.dumps({'erro': mensagem}, ensure_ascii=False).encode('utf-8'))
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/saude':
+            info = responder.cache_info()
+            self._enviar(200, json.dumps({'status': 'ok', 'cache_hits': info.hits, 'cache_misses': info.misses}).encode())
+        else:
+            self._erro(404, "Use POST /projecao ou GET /saude.")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/projecao':
+            return self._erro(404, "Use POST /projecao.")
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        corpo = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        tipo = 'csv' if 'csv' in (self.headers.get('Content-Type') or '') else 'json'
+        try:
+            meses = int(q.get('meses', 12))
+        except ValueError:
+            return self._erro(400, "meses deve ser inteiro.")
+        formato = q.get('formato', 'json')
+        try:
+            dados = responder(ler_parametros(corpo, tipo), meses, q.get('periodo', 'Mensal'), formato)
+        except ErroEntrada as e:
+            return self._erro(400, str(e))
+        except ImportError as e:
+            return self._erro(501, f"Formato indisponível neste servidor: {e}")
+        self._enviar(200, dados, FORMATOS[formato])
+
+
+class ServidorDRE(ThreadingHTTPServer):
+    """HTTP server que atende as conexões num pool fixo de threads."""
+    request_queue_size = 128
+
+    def __init__(self, endereco, workers=8):
+        super().__init__(endereco, _Handler)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dre')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+# --- CLI ---
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Projeção da DRE sem navegador.")
+    sub = ap.add_subparsers(dest='comando', required=True)
+
+    pj = sub.add_parser('projetar', help='projeta a partir de um arquivo de inputs')
+    pj.add_argument('entrada', help="arquivo .csv ou .json no formato do modelo ('-' para stdin JSON)")
+    pj.add_argument('--meses', type=int, default=12)
+    pj.add_argument('--periodo', default='Mensal', choices=list(PERIODOS))
+    pj.add_argument('--formato', default='json', choices=list(FORMATOS))
+    pj.add_argument('--saida', default='-', help="arquivo de saída ('-' para stdout)")
+
+    sv = sub.add_parser('servir', help='sobe o endpoint HTTP local')
+    sv.add_argument('--host', default='127.0.0.1')
+    sv.add_argument('--porta', type=int, default=8765)
+    sv.add_argument('--workers', type=int, default=8)
+
+    args = ap.parse_args(argv)
+    if args.comando == 'servir':
+        servidor = ServidorDRE((args.host, args.porta), args.workers)
+        print(f"Servindo em http://{args.host}:{args.porta} ({args.workers} workers)", file=sys.stderr)
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
+        return 0
+
+    if args.entrada == '-':
+        conteudo = sys.stdin.buffer.read()
+    else:
+        with open(args.entrada, 'rb') as f:
+            conteudo = f.read()
+    try:
+        dados = responder(ler_parametros(conteudo, 'csv' if args.entrada.endswith('.csv') else 'json'),
+                          args.meses, args.periodo, args.formato)
+    except ErroEntrada as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 2
+    except ImportError as e:
+        print(f"Erro: formato {args.formato} indisponível neste ambiente: {e}", file=sys.stderr)
+        return 2
+    if args.saida == '-':
+        sys.stdout.buffer.write(dados)
+    else:
+        with open(args.saida, 'wb') as f:
+            f.write(dados)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
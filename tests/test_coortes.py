@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from coortes import Curvas, projetar_curvas, receita_por_idade
+from modelo import Parametros
+
+
+def test_retencao_relativa_da_projecao():
+    retencao = receita_por_idade(projetar_curvas(Parametros(), Curvas(), 12)).to_numpy()
+    np.testing.assert_allclose(retencao[:, 0], 1.0)
+    assert np.isnan(retencao[-1, 1:]).all()  # além do horizonte
+
+
+def test_coorte_sem_novos_fica_vazia():
+    # receita[coorte, mês]: linha 0 é a base inicial; a coorte do Mês 2 não tem clientes
+    receita = np.array([
+        [100.0, 90.0, 80.0, 70.0],
+        [0.0, 10.0, 9.0, 8.0],
+        [0.0, 0.0, 0.0, 0.0],
+        [0.0, 0.0, 0.0, 20.0],
+    ])
+    retencao = receita_por_idade(SimpleNamespace(receita=receita)).to_numpy()
+    np.testing.assert_allclose(retencao[0], [1.0, 0.9, 0.8])
+    assert np.isnan(retencao[1]).all()
+    np.testing.assert_array_equal(retencao[2, 0], 1.0)
+    assert np.isnan(retencao[2, 1:]).all()
@@ -0,0 +1,19 @@
+import numpy as np
+
+from modelo import Parametros, agregar, projetar
+
+
+def test_ltv_negativo_preservado_nos_periodos():
+    linhas = projetar(Parametros(cogs=600), 12)
+    mensal = linhas["LTV (R$)"]
+    assert (mensal < 0).all()
+    for periodo in ('Trimestral', 'Anual'):
+        ltv = agregar(linhas, periodo)["LTV (R$)"]
+        assert (ltv < 0).all()
+        np.testing.assert_allclose(ltv, mensal[-1])
+
+
+def test_ltv_defaults_agregado_igual_ao_mensal():
+    linhas = projetar(Parametros(), 12)
+    ltv = agregar(linhas, 'Trimestral')["LTV (R$)"]
+    np.testing.assert_allclose(ltv, linhas["LTV (R$)"][[2, 5, 8, 11]], rtol=1e-3)
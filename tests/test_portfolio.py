@@ -0,0 +1,24 @@
+import pandas as pd
+
+from modelo import Parametros
+from portfolio import consolidar, projetar_portfolio, ranking, validar
+
+
+def test_empresa_duplicada_no_formato_largo():
+    df = pd.DataFrame({'Empresa': ['X', 'Y', 'X'], 'cli_ini': [50, 20, 70]})
+    pf = validar(df)
+    assert list(pf.params.index) == ['X', 'Y']
+    assert pf.params.loc['X', 'cli_ini'] == 50
+    assert pf.problemas[['Empresa', 'Problema']].values.tolist() == [['X', 'Empresa duplicada (mantida a primeira linha)']]
+
+    tensor = projetar_portfolio(pf.params, 1)
+    assert consolidar(tensor).loc["1. Clientes Ativos", 'Mês 1'] == tensor[:, 0, 0].sum()
+    assert ranking(tensor, pf.params.index).index.is_unique
+
+
+def test_codigo_duplicado_no_formato_longo():
+    df = pd.DataFrame({'Empresa': ['X', 'X', 'Y'], 'Codigo_Interno': ['ticket', 'ticket', 'ticket'], 'Valor': [100, 200, 300]})
+    pf = validar(df)
+    assert pf.params['ticket'].to_dict() == {'X': 100, 'Y': 300}
+    assert pf.params.loc['Y', 'churn'] == Parametros().churn
+    assert pf.problemas['Problema'].tolist() == ['Código duplicado (mantido o primeiro)']
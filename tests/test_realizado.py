@@ -0,0 +1,141 @@
+import io
+
+import numpy as np
+import pytest
+
+from modelo import Parametros
+from realizado import Formato, Realizado, Regra, caminho_no_diretorio, variancia
+from relatorio import dre_dataframe
+
+REGRAS = [Regra('3', "2.1 Receita Bruta"), Regra('4', "(-) Impostos"), Regra('4.9', "(-) Impostos", -1.0)]
+BRASIL = Formato(sep=';', decimal=',', milhar='.', encoding='latin-1', formato_data='%d/%m/%Y')
+
+
+def receita(real):
+    return real.mensal()["2.1 Receita Bruta"].to_dict()
+
+
+def test_datas_iso_no_formato_padrao():
+    real = Realizado(REGRAS)
+    real.ingerir(io.StringIO("Data,Conta,Valor\n2026-01-05,3.1,1\n2026-01-13,3.1,2\n2026-02-28 10:00:00,3.1,4.5\n"))
+    assert receita(real) == {'2026-01': 3.0, '2026-02': 4.5}
+    assert real.rejeitadas == 0
+
+
+def test_formato_brasil():
+    real = Realizado(REGRAS, BRASIL)
+    real.ingerir(io.BytesIO("Data;Conta;Valor\n05/01/2026;3.1;1.234,50\n13/02/2026;3.1;10,25\n31/02/2026;3.1;1\n".encode('latin-1')))
+    assert receita(real) == {'2026-01': 1234.5, '2026-02': 10.25}
+    assert real.rejeitadas == 1
+
+
+@pytest.mark.parametrize('formato, linhas', [
+    (BRASIL, "Data;Conta;Valor\n05/01/2026;3.1;1.234,50\n06/01/2026;3.1;abc\n07/01/2026;3.1;10,25\nTotal;;1.244,75\n"),
+    (Formato(), "Data,Conta,Valor\n2026-01-05,3.1,1234.5\n2026-01-06,3.1,n/a\n2026-01-07,3.1, 10.25\n"),
+])
+def test_celula_ilegivel_rejeita_so_a_linha(formato, linhas):
+    real = Realizado(REGRAS, formato)
+    real.ingerir(io.BytesIO(linhas.encode(formato.encoding)))
+    assert receita(real) == {'2026-01': 1244.75}
+    assert real.rejeitadas == len(linhas.splitlines()) - 3
+
+
+def test_prefixo_mais_longo_e_conta_sem_mapa():
+    real = Realizado(REGRAS)
+    real.ingerir(io.StringIO("Data,Conta,Valor\n2026-01-05,4.1,10\n2026-01-05,4.9.1,-3\n2026-01-05,9.1,7\n"))
+    assert real.mensal()["(-) Impostos"].tolist() == [13.0]
+    assert real.nao_mapeadas == {'9.1': 7.0}
+
+
+def test_ingestao_incremental_e_linha_parcial(tmp_path):
+    caminho = tmp_path / 'razao.csv'
+    caminho.write_text("Data,Conta,Valor\n2026-01-05,3.1,1\n2026-01-06,3.1,2\n2026-01-0")
+    real = Realizado(REGRAS)
+    assert real.ingerir(caminho) == 2
+    assert list(real.pendente().values()) == [len("2026-01-0")]
+
+    # a linha termina de ser escrita e chegam outras
+    with open(caminho, 'a') as f:
+        f.write("7,3.1,4\n2026-02-01,3.1,8\n")
+    assert real.ingerir(caminho) == 2
+    assert real.ingerir(caminho) == 0
+    assert receita(real) == {'2026-01': 7.0, '2026-02': 8.0}
+    assert real.pendente() == {}
+
+
+def test_export_sem_quebra_final(tmp_path):
+    caminho = tmp_path / 'razao.csv'
+    caminho.write_text("Data,Conta,Valor\n2026-01-05,3.1,1\n2026-01-06,3.1,2")
+    real = Realizado(REGRAS)
+    assert real.ingerir(caminho) == 1
+    assert real.ingerir(caminho, final=True) == 1
+    with open(caminho, 'a') as f:
+        f.write("\n2026-01-07,3.1,4\n")
+    assert real.ingerir(caminho) == 1
+    assert receita(real) == {'2026-01': 7.0}
+
+
+def test_uploads_cumulativos_com_chave():
+    jan = b"Data,Conta,Valor\n2026-01-05,3.1,1\n2026-01-06,3.1,2\n"
+    real = Realizado(REGRAS)
+    assert real.ingerir(io.BytesIO(jan), final=True, chave='upload:razao.csv') == 2
+    assert real.ingerir(io.BytesIO(jan), final=True, chave='upload:razao.csv') == 0
+    assert real.ingerir(io.BytesIO(jan + b"2026-02-01,3.1,8\n"), final=True, chave='upload:razao.csv') == 1
+    assert receita(real) == {'2026-01': 3.0, '2026-02': 8.0}
+    with pytest.raises(ValueError):
+        real.ingerir(io.BytesIO(jan.replace(b",1\n", b",9\n") + b"2026-03-01,3.1,1\n"), final=True, chave='upload:razao.csv')
+    assert receita(real) == {'2026-01': 3.0, '2026-02': 8.0}
+
+
+def test_arquivo_encolhido(tmp_path):
+    caminho = tmp_path / 'razao.csv'
+    caminho.write_text("Data,Conta,Valor\n2026-01-05,3.1,1\n")
+    real = Realizado(REGRAS)
+    real.ingerir(caminho)
+    caminho.write_text("Data,Conta,Valor\n")
+    with pytest.raises(ValueError):
+        real.ingerir(caminho)
+
+
+def test_salvar_e_carregar_retoma_posicao(tmp_path):
+    caminho = tmp_path / 'razao.csv'
+    caminho.write_text("Data;Conta;Valor\n05/01/2026;3.1;1,5\n", encoding='latin-1')
+    real = Realizado(REGRAS, BRASIL)
+    real.ingerir(caminho)
+    real.salvar(tmp_path / 'estado.json')
+
+    with open(caminho, 'a', encoding='latin-1') as f:
+        f.write("06/02/2026;3.1;2,5\n")
+    retomado = Realizado.carregar(tmp_path / 'estado.json')
+    assert retomado.formato == BRASIL and retomado.regras == real.regras
+    assert retomado.ingerir(caminho) == 1
+    assert receita(retomado) == {'2026-01': 1.5, '2026-02': 2.5}
+    assert retomado.linhas == 2
+
+
+def test_caminho_fora_do_diretorio(tmp_path):
+    assert caminho_no_diretorio('razao.csv', tmp_path) == tmp_path.resolve() / 'razao.csv'
+    for caminho in ('../razao.csv', '/etc/passwd'):
+        with pytest.raises(ValueError):
+            caminho_no_diretorio(caminho, tmp_path)
+
+
+def test_variancia_de_periodo_parcial():
+    real = Realizado(REGRAS)
+    real.ingerir(io.StringIO("Data,Conta,Valor\n2026-01-05,3.1,100\n2026-03-05,3.1,300\n"))
+    plano = dre_dataframe(Parametros(), 12)
+
+    anual = variancia(plano, real, '2026-01', 'Anual')
+    rb = plano["2.1 Receita Bruta"].to_numpy()
+    assert anual.a.loc["2.1 Receita Bruta", 'Ano 1'] == pytest.approx(rb[0] + rb[2])
+    assert anual.b.loc["2.1 Receita Bruta", 'Ano 1'] == 400.0
+
+    tri = variancia(plano, real, '2026-01', 'Trimestral')
+    assert tri.b.loc["2.1 Receita Bruta"].tolist()[0] == 400.0
+    assert np.isnan(tri.b.loc["2.1 Receita Bruta"].tolist()[1:]).all()
+    assert tri.a.loc["2.1 Receita Bruta", 'Tri 2'] == pytest.approx(rb[3:6].sum())
+
+    mensal = variancia(plano, real, '2026-01', 'Mensal')
+    assert list(mensal.b.columns[:3]) == ['2026-01', '2026-02', '2026-03']
+    assert np.isnan(mensal.b.loc["2.1 Receita Bruta", '2026-02'])
+    assert mensal.b.loc["1. Clientes Ativos"].isna().all()
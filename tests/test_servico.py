@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from modelo import Parametros
+from relatorio import template_parametros
+from servico import ErroEntrada, ler_parametros, main
+
+PARAMS = Parametros(cresc=0.2, ticket=750.0)
+
+
+def test_csv_do_template():
+    csv = template_parametros(PARAMS).to_csv(index=False).encode('utf-8')
+    assert ler_parametros(csv, 'csv') == PARAMS
+
+
+def test_json_objeto_e_registros():
+    assert ler_parametros(b'{"cresc": 0.2, "ticket": 750}') == PARAMS
+    registros = template_parametros(PARAMS).to_json(orient='records').encode('utf-8')
+    assert ler_parametros(registros) == PARAMS
+
+
+@pytest.mark.parametrize('corpo', [b'5', b'"x"', b'{"nao_existe": 1}', b'[1, 2]', b'{"cresc": "a"}'])
+def test_entradas_invalidas(corpo):
+    with pytest.raises(ErroEntrada):
+        ler_parametros(corpo)
+
+
+def test_cli_projeta_a_partir_do_template(tmp_path, capsys):
+    entrada = tmp_path / 'modelo_inputs.csv'
+    template_parametros(PARAMS).to_csv(entrada, index=False)
+    assert main(['projetar', str(entrada), '--meses', '3']) == 0
+    saida = json.loads(capsys.readouterr().out)
+    assert saida['periodos'] == ['Mês 1', 'Mês 2', 'Mês 3']
+    assert saida['dre']['1.3 Ticket Médio'] == [750.0] * 3